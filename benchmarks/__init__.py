@@ -0,0 +1 @@
+"""Benchmarks for the non-network hot paths of ozon_price_check."""
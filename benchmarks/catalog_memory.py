@@ -0,0 +1,140 @@
+"""Memory per offer: list of pydantic ``Item`` models vs ``CatalogStore``.
+
+Both representations are built from scratch under ``tracemalloc`` and
+measured after everything they were built from (payloads, the source
+``Item`` list) has been freed, so strings the store shares with its source
+are counted as the store's own.
+
+The store's bytes per offer are compared with
+``catalog_memory_baseline.json``; a run fails when they grow by more than
+``--tolerance``. The ``Item`` figure depends on the pydantic version and is
+reported for reference only.
+
+Run with ``uv run python -m benchmarks.catalog_memory [--count N]`` (exit
+code 1 on regression); ``--update-baseline`` rewrites the baseline.
+"""
+
+import argparse
+import gc
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+from benchmarks.payloads import make_items_payload
+from ozon_price_check.catalog import CatalogStore
+from ozon_price_check.schemas import Item
+
+BASELINE_PATH = Path(__file__).with_name("catalog_memory_baseline.json")
+DEFAULT_COUNT = 100_000
+
+
+def _items(count: int) -> list[Item]:
+    return [Item.model_validate(p) for p in make_items_payload(count)]
+
+
+def _retained(build: Callable[[], Any]) -> tuple[Any, int]:
+    """``build()`` and the traced bytes still held once its temporaries are freed."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        base, _ = tracemalloc.get_traced_memory()
+        result = build()
+        gc.collect()
+        current, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, current - base
+
+
+def measure(count: int) -> dict[str, float]:
+    models, models_bytes = _retained(lambda: _items(count))
+    del models
+    store, store_bytes = _retained(lambda: CatalogStore.from_items(_items(count)))
+
+    items = _items(count)
+    started = time.perf_counter()
+    CatalogStore.from_items(items)
+    build_seconds = time.perf_counter() - started
+    del items
+
+    started = time.perf_counter()
+    step = max(1, len(store) // 1000)
+    for row in range(0, len(store), step):
+        store.materialize(row)
+    materialize_us = (
+        (time.perf_counter() - started) / len(range(0, len(store), step)) * 1e6
+    )
+    return {
+        "models_bytes_per_offer": models_bytes / count,
+        "store_bytes_per_offer": store_bytes / count,
+        "build_seconds": build_seconds,
+        "materialize_us": materialize_us,
+    }
+
+
+def load_baseline(path: Path) -> dict[str, Any]:
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def save_baseline(path: Path, count: int, result: dict[str, float]) -> None:
+    data = {
+        "created": datetime.now(UTC).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cases": {
+            f"store@{count}": {
+                "store_bytes_per_offer": result["store_bytes_per_offer"],
+                "models_bytes_per_offer": result["models_bytes_per_offer"],
+            }
+        },
+    }
+    path.write_text(json.dumps(data, indent=2) + "\n", encoding="utf-8")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.catalog_memory")
+    parser.add_argument("--count", type=int, default=DEFAULT_COUNT)
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.05)
+    args = parser.parse_args(argv)
+
+    result = measure(args.count)
+    models, store = result["models_bytes_per_offer"], result["store_bytes_per_offer"]
+    print(f"offers:               {args.count}")
+    print(f"Item models:          {models:10.0f} B/offer")
+    print(f"CatalogStore:         {store:10.0f} B/offer")
+    print(f"ratio:                {models / max(store, 1):10.1f}x")
+    print(f"store build:          {result['build_seconds']:10.3f} s")
+    print(f"materialize:          {result['materialize_us']:10.1f} us/item")
+
+    if args.update_baseline:
+        save_baseline(args.baseline, args.count, result)
+        print(f"baseline written to {args.baseline}")
+        return 0
+
+    reference = load_baseline(args.baseline).get("cases", {}).get(f"store@{args.count}")
+    if reference is None:
+        print(f"no baseline for {args.count} offers; run with --update-baseline")
+        return 0
+    expected = reference["store_bytes_per_offer"]
+    if store > expected * (1 + args.tolerance):
+        print(
+            f"REGRESSION store@{args.count}: {store / expected - 1:+.0%} "
+            f"({store:,.0f} vs {expected:,.0f} B/offer)"
+        )
+        return 1
+    print("no regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
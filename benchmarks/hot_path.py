@@ -0,0 +1,328 @@
+"""Throughput and peak memory of the non-network hot path, with baselines.
+
+Cases cover response validation, ``Item`` computed fields, section building,
+``format_value`` and both profit sections, each at 1, 1k and 100k items.
+Every case is timed (best of repeated runs) and then run once more under
+``tracemalloc`` for its peak memory.
+
+Throughput depends on the machine and on its current load, so it is stored
+normalized by a fixed pure-Python calibration workload timed right before
+and after each case; memory is stored as is. A case regresses when
+normalized throughput drops by more than ``--tolerance`` or peak memory
+grows by more than ``--memory-tolerance``.
+
+Timings on shared machines are noisy, so a case that looks regressed is
+re-measured (``--retries``) and only fails if it stays below the baseline.
+
+Run with ``uv run python -m benchmarks.hot_path`` (exit code 1 on
+regression); ``--update-baseline`` rewrites ``baselines.json``. The full
+suite takes a few minutes; ``--sizes 1,1000`` is a quick check.
+"""
+
+import argparse
+import gc
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from decimal import Decimal
+from pathlib import Path
+from typing import Any
+
+from benchmarks.payloads import make_products_response
+from ozon_price_check.schemas import Item, ProductsResponse
+from ozon_price_check.services.products import (
+    create_profit_for_min_section,
+    create_profit_section,
+    create_section_from_model,
+    format_value,
+    sections_from_item,
+)
+
+BASELINE_PATH = Path(__file__).with_name("baselines.json")
+DEFAULT_SIZES = (1, 1_000, 100_000)
+MIN_TIME = 0.2
+PURCHASE_PRICE = Decimal("750.00")
+_MAIN_SECTION_EXCLUDE = {"commissions", "marketing_actions", "price", "price_indexes"}
+
+
+@dataclass
+class CaseResult:
+    name: str
+    size: int
+    seconds: float
+    peak_bytes: int
+    calibration: float
+
+    @property
+    def items_per_second(self) -> float:
+        return self.size / self.seconds if self.seconds else float("inf")
+
+    @property
+    def normalized_throughput(self) -> float:
+        """Items per calibration workload; comparable across machines."""
+        return self.items_per_second * self.calibration
+
+    def key(self) -> str:
+        return f"{self.name}@{self.size}"
+
+
+def calibrate() -> float:
+    """Seconds for a fixed pure-Python workload (best of 5)."""
+    best = float("inf")
+    for _ in range(5):
+        started = time.perf_counter()
+        total = 0
+        for n in range(300_000):
+            total += n * n % 7
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def _validate(payload: dict[str, Any]) -> Callable[[], Any]:
+    return lambda: ProductsResponse.model_validate(payload).items
+
+
+def _computed_fields(items: list[Item]) -> Callable[[], Any]:
+    def run() -> list[Any]:
+        return [
+            (
+                item.fbs_commission_without_percent,
+                item.fbs_ozon_percent,
+                item.fbs_total_commission,
+                item.fbo_commission_without_percent,
+                item.fbo_ozon_percent,
+                item.fbo_total_commission,
+            )
+            for item in items
+        ]
+
+    return run
+
+
+def _section_from_model(items: list[Item]) -> Callable[[], Any]:
+    return lambda: [
+        create_section_from_model(item, "Основные поля", _MAIN_SECTION_EXCLUDE)
+        for item in items
+    ]
+
+
+def _sections(items: list[Item]) -> Callable[[], Any]:
+    return lambda: [sections_from_item(item, PURCHASE_PRICE) for item in items]
+
+
+def _format_values(items: list[Item]) -> Callable[[], Any]:
+    values: list[Any] = []
+    for item in items:
+        actions = item.marketing_actions
+        values += [
+            item.price.marketing_seller_price,
+            item.price.auto_action_enabled,
+            actions.current_period_from,
+            item.volume_weight,
+            item.offer_id,
+        ]
+    # Five values per item; throughput is still counted in items.
+    return lambda: [format_value(value) for value in values]
+
+
+def _profit_sections(items: list[Item]) -> Callable[[], Any]:
+    return lambda: [
+        (
+            create_profit_section(item, PURCHASE_PRICE),
+            create_profit_for_min_section(item, PURCHASE_PRICE),
+        )
+        for item in items
+    ]
+
+
+def build_cases(size: int) -> dict[str, Callable[[], Any]]:
+    payload = make_products_response(size, seed=size)
+    items = ProductsResponse.model_validate(payload).items
+    return {
+        "validate_response": _validate(payload),
+        "computed_fields": _computed_fields(items),
+        "create_section_from_model": _section_from_model(items),
+        "sections_from_item": _sections(items),
+        "format_value": _format_values(items),
+        "profit_sections": _profit_sections(items),
+    }
+
+
+def _time(run: Callable[[], Any], min_time: float) -> float:
+    """Best per-call time; fast cases are looped so one batch takes ≥ 10 ms."""
+    loops = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(loops):
+            run()
+        elapsed = time.perf_counter() - started
+        if elapsed >= 0.01:
+            break
+        loops *= 10
+
+    best = elapsed / loops
+    spent = elapsed
+    while spent < min_time:
+        gc.collect()
+        started = time.perf_counter()
+        for _ in range(loops):
+            run()
+        elapsed = time.perf_counter() - started
+        best = min(best, elapsed / loops)
+        spent += elapsed
+    return best
+
+
+def _peak_memory(run: Callable[[], Any]) -> int:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        base, _ = tracemalloc.get_traced_memory()
+        result = run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return peak - base
+
+
+def run_suite(
+    sizes: tuple[int, ...] = DEFAULT_SIZES,
+    only: list[str] | None = None,
+    min_time: float = MIN_TIME,
+) -> list[CaseResult]:
+    results = []
+    for size in sizes:
+        for name, run in build_cases(size).items():
+            if only and name not in only:
+                continue
+            before = calibrate()
+            seconds = _time(run, min_time)
+            calibration = (before + calibrate()) / 2
+            result = CaseResult(name, size, seconds, _peak_memory(run), calibration)
+            results.append(result)
+            print(
+                f"{result.key():<36} {result.items_per_second:>14,.0f} items/s "
+                f"{result.peak_bytes / 1024:>12,.0f} KiB peak",
+                flush=True,
+            )
+    return results
+
+
+def load_baseline(path: Path) -> dict[str, Any]:
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def save_baseline(path: Path, results: list[CaseResult]) -> None:
+    data = {
+        "created": datetime.now(UTC).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cases": {
+            r.key(): {
+                "normalized_throughput": r.normalized_throughput,
+                "items_per_second": r.items_per_second,
+                "peak_bytes": r.peak_bytes,
+            }
+            for r in results
+        },
+    }
+    path.write_text(json.dumps(data, indent=2) + "\n", encoding="utf-8")
+
+
+def compare(
+    results: list[CaseResult],
+    baseline: dict[str, Any],
+    tolerance: float,
+    memory_tolerance: float,
+) -> list[str]:
+    """Return a description of every regression against ``baseline``."""
+    regressions = []
+    cases = baseline.get("cases", {})
+    for result in results:
+        reference = cases.get(result.key())
+        if reference is None:
+            continue
+        throughput = result.normalized_throughput
+        expected = reference["normalized_throughput"]
+        if throughput < expected * (1 - tolerance):
+            regressions.append(
+                f"{result.key()}: throughput {throughput / expected - 1:+.0%} "
+                f"(normalized {throughput:,.1f} vs {expected:,.1f})"
+            )
+        # Small absolute differences at tiny sizes are allocator noise.
+        allowed = max(reference["peak_bytes"] * (1 + memory_tolerance), 64 * 1024)
+        if result.peak_bytes > allowed:
+            regressions.append(
+                f"{result.key()}: peak memory "
+                f"{result.peak_bytes / max(reference['peak_bytes'], 1) - 1:+.0%} "
+                f"({result.peak_bytes:,} vs {reference['peak_bytes']:,} B)"
+            )
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.hot_path")
+    parser.add_argument(
+        "--sizes",
+        default=",".join(map(str, DEFAULT_SIZES)),
+        help="Comma-separated item counts",
+    )
+    parser.add_argument("--case", action="append", help="Run only this case")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--memory-tolerance", type=float, default=0.10)
+    parser.add_argument("--min-time", type=float, default=MIN_TIME)
+    parser.add_argument(
+        "--retries",
+        type=int,
+        default=2,
+        help="Re-measure apparent regressions this many times before failing",
+    )
+    args = parser.parse_args(argv)
+
+    sizes = tuple(int(size) for size in args.sizes.split(","))
+    results = run_suite(sizes, args.case, args.min_time)
+
+    if args.update_baseline:
+        save_baseline(args.baseline, results)
+        print(f"baseline written to {args.baseline}")
+        return 0
+
+    baseline = load_baseline(args.baseline)
+    if not baseline:
+        print(f"no baseline at {args.baseline}; run with --update-baseline")
+        return 0
+    for attempt in range(args.retries):
+        suspects = [
+            r
+            for r in results
+            if compare([r], baseline, args.tolerance, args.memory_tolerance)
+        ]
+        if not suspects:
+            break
+        print(f"re-measuring {len(suspects)} case(s), attempt {attempt + 1}")
+        for suspect in suspects:
+            (retry,) = run_suite((suspect.size,), [suspect.name], args.min_time)
+            if retry.normalized_throughput > suspect.normalized_throughput:
+                suspect.seconds, suspect.calibration = retry.seconds, retry.calibration
+            suspect.peak_bytes = min(suspect.peak_bytes, retry.peak_bytes)
+
+    regressions = compare(results, baseline, args.tolerance, args.memory_tolerance)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    if not regressions:
+        print("no regressions")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
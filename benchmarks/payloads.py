@@ -0,0 +1,96 @@
+"""Synthetic ``/v5/product/info/prices`` payloads for benchmarks."""
+
+import random
+from typing import Any
+
+_COLORS = ("GREEN", "YELLOW", "RED", "WITHOUT_INDEX")
+_ACTION_TITLES = (
+    "Распродажа недели",
+    "Эластичный бустинг",
+    "Скидки на всё",
+    "Товар дня",
+)
+
+
+def _money(rng: random.Random, low: float, high: float) -> str:
+    return f"{rng.uniform(low, high):.2f}"
+
+
+def _index_data(rng: random.Random) -> dict[str, Any] | None:
+    if rng.random() < 0.3:
+        return None
+    return {
+        "min_price": round(rng.uniform(100, 5000), 2),
+        "min_price_currency": "RUB",
+        "price_index_value": round(rng.uniform(0.5, 1.5), 2),
+    }
+
+
+def make_item_payload(n: int, rng: random.Random | None = None) -> dict[str, Any]:
+    """Build one realistic price item payload with ``offer_id`` ``SKU-<n>``."""
+    rng = rng or random.Random(n)
+    price = rng.uniform(200, 20000)
+    actions = [
+        {
+            "date_from": "2025-07-01T00:00:00Z",
+            "date_to": "2025-07-31T23:59:59Z",
+            "title": rng.choice(_ACTION_TITLES),
+            "value": round(rng.uniform(1, 30), 1),
+        }
+        for _ in range(rng.randint(0, 3))
+    ]
+    return {
+        "acquiring": _money(rng, 1, 200),
+        "commissions": {
+            "fbo_deliv_to_customer_amount": _money(rng, 0, 50),
+            "fbo_direct_flow_trans_max_amount": _money(rng, 10, 200),
+            "fbo_direct_flow_trans_min_amount": _money(rng, 5, 100),
+            "fbo_return_flow_amount": _money(rng, 0, 100),
+            "fbs_deliv_to_customer_amount": _money(rng, 0, 50),
+            "fbs_direct_flow_trans_max_amount": _money(rng, 10, 200),
+            "fbs_direct_flow_trans_min_amount": _money(rng, 5, 100),
+            "fbs_first_mile_max_amount": _money(rng, 0, 50),
+            "fbs_first_mile_min_amount": _money(rng, 0, 25),
+            "fbs_return_flow_amount": _money(rng, 0, 100),
+            "sales_percent_fbo": rng.choice(("10", "12", "15", "19.5")),
+            "sales_percent_fbs": rng.choice(("12", "14", "17", "21")),
+        },
+        "marketing_actions": {
+            "actions": actions,
+            "current_period_from": "2025-07-01T00:00:00Z" if actions else None,
+            "current_period_to": "2025-07-31T23:59:59Z" if actions else None,
+            "ozon_actions_exist": bool(actions),
+        },
+        "offer_id": f"SKU-{n}",
+        "price": {
+            "auto_action_enabled": rng.random() < 0.5,
+            "auto_add_to_ozon_actions_list_enabled": rng.random() < 0.5,
+            "currency_code": "RUB",
+            "marketing_price": f"{price * 0.9:.2f}",
+            "marketing_seller_price": f"{price * 0.95:.2f}",
+            "min_price": f"{price * 0.8:.2f}",
+            "net_price": f"{price * 0.5:.2f}",
+            "old_price": f"{price * 1.2:.2f}",
+            "price": f"{price:.2f}",
+            "retail_price": "0",
+            "vat": "0.2",
+        },
+        "price_indexes": {
+            "color_index": rng.choice(_COLORS),
+            "external_index_data": _index_data(rng),
+            "ozon_index_data": _index_data(rng),
+            "self_marketplaces_index_data": _index_data(rng),
+        },
+        "product_id": 100_000_000 + n,
+        "volume_weight": round(rng.uniform(0.1, 20), 1),
+    }
+
+
+def make_items_payload(count: int, seed: int = 0) -> list[dict[str, Any]]:
+    rng = random.Random(seed)
+    return [make_item_payload(n, rng) for n in range(count)]
+
+
+def make_products_response(count: int, seed: int = 0) -> dict[str, Any]:
+    """Build a full ``ProductsResponse`` payload with ``count`` items."""
+    return {"cursor": "", "items": make_items_payload(count, seed), "total": count}
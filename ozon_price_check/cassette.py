@@ -0,0 +1,182 @@
+"""Record/replay cassettes for ``APIClient``.
+
+A cassette is an append-only file with one interaction per line::
+
+    <key>\\t<json record>\\n
+
+where ``key`` is a hash of the method, endpoint and normalized request body.
+In record mode every request made by the client is appended with a single
+unbuffered ``O_APPEND`` write, so several clients (and processes) recording
+into one file never interleave partial lines. In replay mode the file is
+memory-mapped and an offset index is built once per file and process, shared
+by all clients, and responses are served from it without touching the
+network.
+
+Credentials are never written: headers are not recorded at all and any
+secret-looking keys in bodies are replaced with ``"***"``.
+
+Enable for any ``APIClient`` with environment variables::
+
+    OZON_CASSETTE=/path/to/file.cassette OZON_CASSETTE_MODE=record|replay
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import threading
+from pathlib import Path
+from typing import Any, NamedTuple, Optional
+
+CASSETTE_ENV = "OZON_CASSETTE"
+CASSETTE_MODE_ENV = "OZON_CASSETTE_MODE"
+
+RECORD = "record"
+REPLAY = "replay"
+
+REDACTED = "***"
+SECRET_KEYS = frozenset(
+    {"api-key", "api_key", "apikey", "client-id", "client_id", "authorization", "token"}
+)
+
+
+class CassetteMiss(KeyError):
+    """Raised in replay mode when a request is not in the cassette."""
+
+
+class _ReplayIndex(NamedTuple):
+    stamp: tuple[int, int]
+    mmap: mmap.mmap
+    spans: dict[str, tuple[int, int]]
+
+
+_lock = threading.Lock()
+# Replay indexes by resolved path; rebuilt when the file's size or mtime changes.
+_indexes: dict[Path, _ReplayIndex] = {}
+
+
+def _build_index(path: Path, stamp: tuple[int, int]) -> _ReplayIndex:
+    with path.open("rb") as fh:
+        mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+    spans: dict[str, tuple[int, int]] = {}
+    position, size = 0, len(mm)
+    while position < size:
+        line_end = mm.find(b"\n", position)
+        if line_end == -1:
+            line_end = size
+        tab = mm.find(b"\t", position, line_end)
+        if tab != -1:
+            # Later recordings of the same request win.
+            spans[mm[position:tab].decode()] = (tab + 1, line_end)
+        position = line_end + 1
+    return _ReplayIndex(stamp, mm, spans)
+
+
+def _replay_index(path: Path) -> _ReplayIndex | None:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    if stat.st_size == 0:
+        return None
+    stamp = (stat.st_size, stat.st_mtime_ns)
+    with _lock:
+        index = _indexes.get(path)
+        if index is None or index.stamp != stamp:
+            # The previous mmap stays open: clients may still read from it.
+            index = _indexes[path] = _build_index(path, stamp)
+        return index
+
+
+def redact(value: Any) -> Any:
+    """Return a copy of ``value`` with secret-looking keys masked."""
+    if isinstance(value, dict):
+        return {
+            key: REDACTED if str(key).lower() in SECRET_KEYS else redact(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [redact(item) for item in value]
+    return value
+
+
+def _endpoint(url: Any) -> str:
+    return str(getattr(url, "value", url))
+
+
+def request_key(method: str, url: Any, body: dict[str, Any] | None) -> str:
+    """Stable key for a request: method, endpoint and canonical JSON body."""
+    canonical = json.dumps(
+        redact(body), sort_keys=True, separators=(",", ":"), ensure_ascii=False
+    )
+    payload = f"{method.upper()} {_endpoint(url)}\n{canonical}".encode()
+    return hashlib.sha256(payload).hexdigest()[:32]
+
+
+class Cassette:
+    def __init__(self, path: Path, mode: str = REPLAY) -> None:
+        if mode not in (RECORD, REPLAY):
+            raise ValueError(f"Unknown cassette mode: {mode!r}")
+        self.path = Path(path).resolve()
+        self.mode = mode
+        self._fd: int | None = None
+        self._index: _ReplayIndex | None = None
+
+    @classmethod
+    def from_env(cls) -> Optional["Cassette"]:
+        path = os.environ.get(CASSETTE_ENV)
+        if not path:
+            return None
+        return cls(Path(path), os.environ.get(CASSETTE_MODE_ENV, REPLAY).lower())
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == REPLAY
+
+    def record(
+        self,
+        method: str,
+        url: Any,
+        body: dict[str, Any] | None,
+        status: int,
+        response: Any,
+    ) -> None:
+        """Append one interaction to the cassette."""
+        if self._fd is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        record = {
+            "method": method.upper(),
+            "url": _endpoint(url),
+            "body": redact(body),
+            "status": status,
+            "response": redact(response),
+        }
+        line = json.dumps(record, separators=(",", ":"), ensure_ascii=False)
+        data = f"{request_key(method, url, body)}\t{line}\n".encode()
+        with _lock:
+            # One write per record; a short write is finished before the lock
+            # is released.
+            written = os.write(self._fd, data)
+            while written < len(data):
+                written += os.write(self._fd, data[written:])
+
+    def play(
+        self, method: str, url: Any, body: dict[str, Any] | None
+    ) -> dict[str, Any]:
+        """Return the recorded interaction (status and response) for a request."""
+        if self._index is None and self.replaying:
+            self._index = _replay_index(self.path)
+        key = request_key(method, url, body)
+        span = self._index.spans.get(key) if self._index is not None else None
+        if span is None or self._index is None:
+            raise CassetteMiss(f"{method.upper()} {_endpoint(url)} body={body}")
+        start, end = span
+        return json.loads(self._index.mmap[start:end])
+
+    def close(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+        # The shared replay index outlives this client.
+        self._index = None
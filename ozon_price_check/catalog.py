@@ -0,0 +1,505 @@
+"""Compact in-memory catalog store for large numbers of offers.
+
+Pydantic ``Item`` instances are convenient but heavy: every offer carries five
+nested models, a dozen ``Decimal`` objects and its own copies of repeated
+strings. ``CatalogStore`` keeps the same data as struct-of-arrays columns:
+
+* money fields are fixed-point integers (``DECIMAL_PLACES`` digits) in ``array("q")``;
+* floats live in ``array("d")``, flags in ``bytearray``;
+* datetimes are UTC microseconds in ``array("q")`` (``_NO_DATE`` marks ``None``);
+* repeated strings (currency codes, colour indexes, action titles) are interned.
+
+A full ``Item`` is materialized on demand, e.g. when a card is opened. Product
+info from ``/v3/product/info/list`` (name, barcodes, stocks) is optional and
+kept in its own columns.
+
+``dump``/``load`` persist the store without ``pickle``: a JSON header with
+the string columns, followed by the raw bytes of the numeric columns.
+"""
+
+import json
+import sys
+from array import array
+from collections.abc import Iterable, Iterator
+from datetime import UTC, datetime
+from decimal import ROUND_HALF_UP, Decimal
+from typing import BinaryIO
+
+from ozon_price_check.schemas import (
+    Commissions,
+    Item,
+    MarketingAction,
+    MarketingActions,
+    Price,
+    PriceIndexData,
+    PriceIndexes,
+    ProductInfo,
+    ProductStock,
+    ProductStocks,
+)
+
+DECIMAL_PLACES = 4
+
+FIXED_SCALE = 10**DECIMAL_PLACES
+_SCALE_DECIMAL = Decimal(FIXED_SCALE)
+_NO_DATE = -(2**63)
+_EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+
+COMMISSION_FIELDS: tuple[str, ...] = tuple(Commissions.model_fields)
+PRICE_DECIMAL_FIELDS: tuple[str, ...] = tuple(
+    name for name, field in Price.model_fields.items() if field.annotation is Decimal
+)
+PRICE_FLAG_FIELDS: tuple[str, ...] = (
+    "auto_action_enabled",
+    "auto_add_to_ozon_actions_list_enabled",
+)
+INDEX_DATA_FIELDS: tuple[str, ...] = (
+    "external_index_data",
+    "ozon_index_data",
+    "self_marketplaces_index_data",
+)
+DECIMAL_COLUMNS: tuple[str, ...] = (
+    ("acquiring",) + COMMISSION_FIELDS + PRICE_DECIMAL_FIELDS
+)
+
+# Fixed costs that make up ``Item.fbs/fbo_commission_without_percent``.
+COMMISSION_WITHOUT_PERCENT_FIELDS: dict[str, tuple[str, ...]] = {
+    "fbs": (
+        "acquiring",
+        "fbs_deliv_to_customer_amount",
+        "fbs_first_mile_max_amount",
+        "fbs_direct_flow_trans_max_amount",
+    ),
+    "fbo": (
+        "acquiring",
+        "fbo_deliv_to_customer_amount",
+        "fbo_direct_flow_trans_max_amount",
+    ),
+}
+SALES_PERCENT_FIELDS: dict[str, str] = {
+    "fbs": "sales_percent_fbs",
+    "fbo": "sales_percent_fbo",
+}
+
+# (title, date_from_us, date_to_us, value)
+_ActionRecord = tuple[str, int, int, float]
+_NO_ACTIONS: tuple[_ActionRecord, ...] = ()
+# (source, present, reserved)
+_StockRecord = tuple[str, int, int]
+
+
+def to_fixed(value: Decimal) -> int:
+    """Convert a Decimal to the store's fixed-point integer representation."""
+    return int((value * _SCALE_DECIMAL).to_integral_value(ROUND_HALF_UP))
+
+
+def from_fixed(value: int) -> Decimal:
+    """Convert a fixed-point integer back to a Decimal."""
+    return Decimal(value) / _SCALE_DECIMAL
+
+
+def round_half_up_div(numerator: int, denominator: int) -> int:
+    """Integer division rounding half away from zero, like ``ROUND_HALF_UP``."""
+    quotient, remainder = divmod(abs(numerator), denominator)
+    if 2 * remainder >= denominator:
+        quotient += 1
+    return quotient if numerator >= 0 else -quotient
+
+
+def margin_hundredths(profit: int, purchase: int) -> int:
+    """Margin of fixed-point ``profit`` over ``purchase`` in hundredths of a percent.
+
+    Matches ``products.calculate_profit``: profit / purchase · 100 quantized
+    to 0.01 with ``ROUND_HALF_EVEN`` (the ``Decimal`` context default), and 0
+    without a positive purchase price.
+    """
+    if purchase <= 0:
+        return 0
+    quotient, remainder = divmod(profit * 10_000, purchase)
+    twice = 2 * remainder
+    if twice > purchase or (twice == purchase and quotient & 1):
+        quotient += 1
+    return quotient
+
+
+def _to_micros(value: datetime | None) -> int:
+    if value is None:
+        return _NO_DATE
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=UTC)
+    delta = value - _EPOCH
+    return (delta.days * 86_400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+def _from_micros(value: int) -> datetime | None:
+    if value == _NO_DATE:
+        return None
+    return datetime.fromtimestamp(value // 1_000_000, tz=UTC).replace(
+        microsecond=value % 1_000_000
+    )
+
+
+def _intern(value: str) -> str:
+    return sys.intern(value)
+
+
+class CatalogStore:
+    """Struct-of-arrays storage for catalog items keyed by ``offer_id``.
+
+    Rows are append-only; adding an item with a known ``offer_id`` overwrites
+    its row in place, so row numbers stay stable for indexes built on top.
+    """
+
+    def __init__(self) -> None:
+        self.offer_ids: list[str] = []
+        self.product_ids = array("q")
+        self.volume_weights = array("d")
+        self.decimals: dict[str, array] = {name: array("q") for name in DECIMAL_COLUMNS}
+        self.flags: dict[str, bytearray] = {
+            name: bytearray() for name in PRICE_FLAG_FIELDS + ("ozon_actions_exist",)
+        }
+        self.currency_codes: list[str] = []
+        self.color_indexes: list[str] = []
+        # Bit ``i`` is set when ``INDEX_DATA_FIELDS[i]`` is present.
+        self.index_presence = bytearray()
+        self.index_min_prices: dict[str, array] = {
+            name: array("d") for name in INDEX_DATA_FIELDS
+        }
+        self.index_values: dict[str, array] = {
+            name: array("d") for name in INDEX_DATA_FIELDS
+        }
+        self.index_currencies: dict[str, list[str]] = {
+            name: [] for name in INDEX_DATA_FIELDS
+        }
+        self.period_from = array("q")
+        self.period_to = array("q")
+        self.actions: list[tuple[_ActionRecord, ...]] = []
+        # Product info; ``has_info`` is 0 until info for the row is known.
+        self.has_info = bytearray()
+        self.names: list[str] = []
+        self.barcodes: list[tuple[str, ...]] = []
+        self.stocks: list[tuple[_StockRecord, ...]] = []
+        self._row_by_offer: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.offer_ids)
+
+    def __contains__(self, offer_id: object) -> bool:
+        return offer_id in self._row_by_offer
+
+    def _binary_columns(self) -> list[tuple[str, array | bytearray]]:
+        columns: list[tuple[str, array | bytearray]] = [
+            ("product_ids", self.product_ids),
+            ("volume_weights", self.volume_weights),
+        ]
+        columns += [(f"decimals.{n}", c) for n, c in self.decimals.items()]
+        columns += [(f"flags.{n}", c) for n, c in self.flags.items()]
+        columns.append(("index_presence", self.index_presence))
+        columns += [
+            (f"index_min_prices.{n}", c) for n, c in self.index_min_prices.items()
+        ]
+        columns += [(f"index_values.{n}", c) for n, c in self.index_values.items()]
+        columns += [
+            ("period_from", self.period_from),
+            ("period_to", self.period_to),
+            ("has_info", self.has_info),
+        ]
+        return columns
+
+    def dump(self, fh: BinaryIO) -> None:
+        """Write the store: a length-prefixed JSON header, then numeric columns."""
+        columns = self._binary_columns()
+        header = {
+            "rows": len(self),
+            "byteorder": sys.byteorder,
+            "columns": [name for name, _ in columns],
+            "offer_ids": self.offer_ids,
+            "currency_codes": self.currency_codes,
+            "color_indexes": self.color_indexes,
+            "index_currencies": self.index_currencies,
+            "actions": self.actions,
+            "names": self.names,
+            "barcodes": self.barcodes,
+            "stocks": self.stocks,
+        }
+        data = json.dumps(header, ensure_ascii=False, separators=(",", ":")).encode()
+        fh.write(len(data).to_bytes(8, "little"))
+        fh.write(data)
+        fh.writelines(column for _, column in columns)
+
+    @classmethod
+    def load(cls, fh: BinaryIO) -> "CatalogStore":
+        """Read a store written by ``dump``; raises ValueError on a mismatch."""
+        size = int.from_bytes(fh.read(8), "little")
+        header = json.loads(fh.read(size))
+        store = cls()
+        rows = header["rows"]
+        columns = store._binary_columns()
+        if header["columns"] != [name for name, _ in columns]:
+            raise ValueError("Catalog columns do not match this version")
+        for _, column in columns:
+            itemsize = column.itemsize if isinstance(column, array) else 1
+            data = fh.read(rows * itemsize)
+            if len(data) != rows * itemsize:
+                raise ValueError("Catalog file is truncated")
+            if isinstance(column, array):
+                column.frombytes(data)
+                if header["byteorder"] != sys.byteorder:
+                    column.byteswap()
+            else:
+                column.extend(data)
+
+        # Floats stay floats in JSON; only strings need interning again.
+        intern = sys.intern
+        store.offer_ids = header["offer_ids"]
+        store.currency_codes = list(map(intern, header["currency_codes"]))
+        store.color_indexes = list(map(intern, header["color_indexes"]))
+        store.index_currencies = {
+            name: list(map(intern, values))
+            for name, values in header["index_currencies"].items()
+        }
+        store.actions = [
+            tuple(
+                (intern(title), date_from, date_to, value)
+                for title, date_from, date_to, value in actions
+            )
+            if actions
+            else _NO_ACTIONS
+            for actions in header["actions"]
+        ]
+        store.names = header["names"]
+        store.barcodes = [tuple(barcodes) for barcodes in header["barcodes"]]
+        store.stocks = [
+            tuple(
+                (intern(source), present, reserved)
+                for source, present, reserved in stocks
+            )
+            for stocks in header["stocks"]
+        ]
+        store._row_by_offer = {
+            offer_id: row for row, offer_id in enumerate(store.offer_ids)
+        }
+        return store
+
+    @classmethod
+    def from_items(cls, items: Iterable[Item]) -> "CatalogStore":
+        store = cls()
+        store.extend(items)
+        return store
+
+    def row_of(self, offer_id: str) -> int | None:
+        """Return the row number for ``offer_id`` or None if it is unknown."""
+        return self._row_by_offer.get(offer_id)
+
+    def extend(self, items: Iterable[Item]) -> None:
+        for item in items:
+            self.add(item)
+
+    def add(self, item: Item, info: ProductInfo | None = None) -> int:
+        """Insert or update an item (and its product info) and return its row."""
+        row = self._row_by_offer.get(item.offer_id)
+        if row is None:
+            row = self._append_empty(item.offer_id)
+        self._write(row, item)
+        if info is not None:
+            self._write_info(row, info)
+        return row
+
+    def _write_info(self, row: int, info: ProductInfo) -> None:
+        self.has_info[row] = 1
+        self.names[row] = info.name
+        self.barcodes[row] = tuple(info.barcodes)
+        self.stocks[row] = tuple(
+            (_intern(stock.source), stock.present, stock.reserved)
+            for stock in info.stocks.stocks
+        )
+
+    def product_info(self, row: int) -> ProductInfo | None:
+        """Rebuild the ``ProductInfo`` for a row, or None if it is unknown."""
+        if not self.has_info[row]:
+            return None
+        stocks = [
+            ProductStock.model_construct(
+                source=source, present=present, reserved=reserved
+            )
+            for source, present, reserved in self.stocks[row]
+        ]
+        return ProductInfo.model_construct(
+            product_id=self.product_ids[row],
+            offer_id=self.offer_ids[row],
+            name=self.names[row],
+            barcodes=list(self.barcodes[row]),
+            stocks=ProductStocks.model_construct(
+                has_stock=any(present for _, present, _ in self.stocks[row]),
+                stocks=stocks,
+            ),
+        )
+
+    def _append_empty(self, offer_id: str) -> int:
+        row = len(self.offer_ids)
+        self.offer_ids.append(offer_id)
+        self.product_ids.append(0)
+        self.volume_weights.append(0.0)
+        for column in self.decimals.values():
+            column.append(0)
+        for flags in self.flags.values():
+            flags.append(0)
+        self.currency_codes.append("")
+        self.color_indexes.append("")
+        self.index_presence.append(0)
+        for name in INDEX_DATA_FIELDS:
+            self.index_min_prices[name].append(0.0)
+            self.index_values[name].append(0.0)
+            self.index_currencies[name].append("")
+        self.period_from.append(_NO_DATE)
+        self.period_to.append(_NO_DATE)
+        self.actions.append(_NO_ACTIONS)
+        self.has_info.append(0)
+        self.names.append("")
+        self.barcodes.append(())
+        self.stocks.append(())
+        self._row_by_offer[offer_id] = row
+        return row
+
+    def _write(self, row: int, item: Item) -> None:
+        self.product_ids[row] = item.product_id
+        self.volume_weights[row] = item.volume_weight
+        self.decimals["acquiring"][row] = to_fixed(item.acquiring)
+        for name in COMMISSION_FIELDS:
+            self.decimals[name][row] = to_fixed(getattr(item.commissions, name))
+        for name in PRICE_DECIMAL_FIELDS:
+            self.decimals[name][row] = to_fixed(getattr(item.price, name))
+        for name in PRICE_FLAG_FIELDS:
+            self.flags[name][row] = bool(getattr(item.price, name))
+        self.currency_codes[row] = _intern(item.price.currency_code)
+
+        indexes = item.price_indexes
+        self.color_indexes[row] = _intern(indexes.color_index)
+        presence = 0
+        for bit, name in enumerate(INDEX_DATA_FIELDS):
+            data: PriceIndexData | None = getattr(indexes, name)
+            if data is None:
+                continue
+            presence |= 1 << bit
+            self.index_min_prices[name][row] = data.min_price
+            self.index_values[name][row] = data.price_index_value
+            self.index_currencies[name][row] = _intern(data.min_price_currency)
+        self.index_presence[row] = presence
+
+        marketing = item.marketing_actions
+        self.flags["ozon_actions_exist"][row] = marketing.ozon_actions_exist
+        self.period_from[row] = _to_micros(marketing.current_period_from)
+        self.period_to[row] = _to_micros(marketing.current_period_to)
+        self.actions[row] = (
+            tuple(
+                (
+                    _intern(action.title),
+                    _to_micros(action.date_from),
+                    _to_micros(action.date_to),
+                    action.value,
+                )
+                for action in marketing.actions
+            )
+            or _NO_ACTIONS
+        )
+
+    def decimal(self, name: str, row: int) -> Decimal:
+        """Return a single money field as a Decimal."""
+        return from_fixed(self.decimals[name][row])
+
+    def total_commissions(
+        self,
+        scheme: str,
+        price_field: str = "marketing_seller_price",
+        fixed_fields: tuple[str, ...] | None = None,
+    ) -> array:
+        """Compute ``Item.<scheme>_total_commission`` for every row at once.
+
+        Uses exact integer arithmetic with the same ``ROUND_HALF_UP`` steps as
+        the ``Item`` computed fields. ``price_field`` selects the price the
+        sales percent is taken from and ``fixed_fields`` overrides the fixed
+        cost components. Values are fixed-point whole rubles.
+        """
+        columns = [
+            self.decimals[name]
+            for name in (fixed_fields or COMMISSION_WITHOUT_PERCENT_FIELDS[scheme])
+        ]
+        prices = self.decimals[price_field]
+        percents = self.decimals[SALES_PERCENT_FIELDS[scheme]]
+        percent_scale = 100 * FIXED_SCALE * FIXED_SCALE
+        result = array("q", bytes(8 * len(self)))
+        for row in range(len(self)):
+            ozon_percent = round_half_up_div(prices[row] * percents[row], percent_scale)
+            fixed = sum(column[row] for column in columns)
+            result[row] = (
+                round_half_up_div(ozon_percent * FIXED_SCALE + fixed, FIXED_SCALE)
+                * FIXED_SCALE
+            )
+        return result
+
+    def get(self, offer_id: str) -> Item | None:
+        """Materialize the item for ``offer_id`` or return None."""
+        row = self._row_by_offer.get(offer_id)
+        return None if row is None else self.materialize(row)
+
+    def __iter__(self) -> Iterator[Item]:
+        for row in range(len(self)):
+            yield self.materialize(row)
+
+    def materialize(self, row: int) -> Item:
+        """Rebuild a full ``Item`` model for the given row.
+
+        Values come from already validated items, so models are constructed
+        without re-running validation.
+        """
+        decimals = self.decimals
+        commissions = Commissions.model_construct(
+            **{name: from_fixed(decimals[name][row]) for name in COMMISSION_FIELDS}
+        )
+        price = Price.model_construct(
+            currency_code=self.currency_codes[row],
+            **{name: from_fixed(decimals[name][row]) for name in PRICE_DECIMAL_FIELDS},
+            **{name: bool(self.flags[name][row]) for name in PRICE_FLAG_FIELDS},
+        )
+
+        presence = self.index_presence[row]
+        index_data: dict[str, PriceIndexData | None] = {}
+        for bit, name in enumerate(INDEX_DATA_FIELDS):
+            index_data[name] = (
+                PriceIndexData.model_construct(
+                    min_price=self.index_min_prices[name][row],
+                    min_price_currency=self.index_currencies[name][row],
+                    price_index_value=self.index_values[name][row],
+                )
+                if presence & (1 << bit)
+                else None
+            )
+        price_indexes = PriceIndexes.model_construct(
+            color_index=self.color_indexes[row], **index_data
+        )
+
+        marketing_actions = MarketingActions.model_construct(
+            actions=[
+                MarketingAction.model_construct(
+                    title=title,
+                    date_from=_from_micros(date_from),
+                    date_to=_from_micros(date_to),
+                    value=value,
+                )
+                for title, date_from, date_to, value in self.actions[row]
+            ],
+            current_period_from=_from_micros(self.period_from[row]),
+            current_period_to=_from_micros(self.period_to[row]),
+            ozon_actions_exist=bool(self.flags["ozon_actions_exist"][row]),
+        )
+
+        return Item.model_construct(
+            acquiring=from_fixed(decimals["acquiring"][row]),
+            commissions=commissions,
+            marketing_actions=marketing_actions,
+            offer_id=self.offer_ids[row],
+            price=price,
+            price_indexes=price_indexes,
+            product_id=self.product_ids[row],
+            volume_weight=self.volume_weights[row],
+        )
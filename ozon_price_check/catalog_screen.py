@@ -0,0 +1,355 @@
+import math
+from collections.abc import Awaitable, Callable, Mapping
+from decimal import Decimal
+from pathlib import Path
+from typing import ClassVar
+
+from rich.segment import Segment
+from rich.style import Style
+from textual import work
+from textual.app import ComposeResult
+from textual.binding import Binding, BindingType
+from textual.geometry import Size
+from textual.message import Message
+from textual.reactive import reactive
+from textual.screen import Screen
+from textual.scroll_view import ScrollView
+from textual.strip import Strip
+from textual.widgets import Footer, Input, Static
+
+from ozon_price_check.catalog import FIXED_SCALE, CatalogStore
+from ozon_price_check.core_client import APIClient, FetchError
+from ozon_price_check.lookup_server import LookupClient, LookupServerError
+from ozon_price_check.services.catalog import (
+    CATALOG_COLUMNS,
+    CatalogMetrics,
+    catalog_view_order,
+    compute_metrics,
+    parse_filter,
+    save_catalog,
+    sync_catalog,
+)
+from ozon_price_check.services.export import export_store
+from ozon_price_check.utils import get_current_date
+
+# Column key -> (width, align right)
+_COLUMN_LAYOUT: dict[str, tuple[int, bool]] = {
+    "offer_id": (24, False),
+    "price": (12, True),
+    "min_price": (12, True),
+    "fbs": (13, True),
+    "fbo": (13, True),
+    "profit": (12, True),
+    "margin": (15, True),
+    "color": (14, False),
+}
+_COLOR_STYLES = {
+    "GREEN": Style(color="green"),
+    "YELLOW": Style(color="yellow"),
+    "RED": Style(color="red"),
+}
+_CURSOR_STYLE = Style(reverse=True)
+
+# Returns the app's shared client, or None without saved credentials.
+ClientProvider = Callable[[], Awaitable[APIClient | LookupClient | None]]
+
+
+def _fit(text: str, width: int, right: bool) -> str:
+    text = text[:width]
+    return text.rjust(width) if right else text.ljust(width)
+
+
+def _format_cell(metrics: CatalogMetrics, key: str, row: int) -> str:
+    value = metrics.column(key)[row]
+    if key in ("offer_id", "color"):
+        return value
+    if key in ("profit", "margin"):
+        if math.isnan(value):
+            return "—"
+        return f"{value:.2f}%" if key == "margin" else f"{value:.2f}"
+    return f"{value / FIXED_SCALE:.2f}"
+
+
+def _concurrency_text(client: APIClient | LookupClient) -> str:
+    if isinstance(client, LookupClient):
+        return "через общий сервер"
+    limits = ", ".join(
+        f"{endpoint} ×{stats['limit']}"
+        + (f" (в очереди {stats['queued']})" if stats["queued"] else "")
+        for endpoint, stats in client.metrics().items()
+    )
+    return f"параллельность: {limits or '—'}"
+
+
+def catalog_header_text() -> str:
+    return " ".join(
+        _fit(f"{n}:{CATALOG_COLUMNS[key]}", width, right)
+        for n, (key, (width, right)) in enumerate(_COLUMN_LAYOUT.items(), 1)
+    )
+
+
+class CatalogTable(ScrollView, can_focus=True):
+    """Virtualized catalog table: only the visible lines are rendered."""
+
+    BINDINGS: ClassVar[list[BindingType]] = [
+        Binding("up", "cursor_up", show=False),
+        Binding("down", "cursor_down", show=False),
+        Binding("pageup", "page_up", show=False),
+        Binding("pagedown", "page_down", show=False),
+        Binding("home", "first", show=False),
+        Binding("end", "last", show=False),
+        Binding("enter", "select", "Открыть карточку"),
+    ] + [
+        Binding(str(n), f"sort('{key}')", show=False)
+        for n, key in enumerate(_COLUMN_LAYOUT, 1)
+    ]
+
+    cursor_row: reactive[int] = reactive(0)
+
+    class Selected(Message):
+        def __init__(self, offer_id: str) -> None:
+            super().__init__()
+            self.offer_id = offer_id
+
+    def __init__(self, metrics: CatalogMetrics, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.metrics = metrics
+        self.sort_key = "offer_id"
+        self.descending = False
+        self.row_filter = None
+        self.order: list[int] = []
+        self._width = sum(width + 1 for width, _ in _COLUMN_LAYOUT.values())
+
+    def on_mount(self) -> None:
+        self.rebuild()
+
+    def set_metrics(self, metrics: CatalogMetrics) -> None:
+        self.metrics = metrics
+        self.row_filter = None
+        self.rebuild()
+
+    def rebuild(self) -> None:
+        """Recompute the display order from cached sort indexes."""
+        self.order = catalog_view_order(
+            self.metrics, self.sort_key, self.descending, self.row_filter
+        )
+        self.virtual_size = Size(self._width, len(self.order))
+        self.cursor_row = min(self.cursor_row, max(len(self.order) - 1, 0))
+        self.refresh()
+
+    def render_line(self, y: int) -> Strip:
+        position = round(self.scroll_y) + y
+        if position >= len(self.order):
+            return Strip.blank(self.size.width)
+
+        row = self.order[position]
+        base = _CURSOR_STYLE if position == self.cursor_row else Style()
+        segments = []
+        for key, (width, right) in _COLUMN_LAYOUT.items():
+            text = _fit(_format_cell(self.metrics, key, row), width, right) + " "
+            style = base
+            if key == "color":
+                style = _COLOR_STYLES.get(self.metrics.column(key)[row], Style()) + base
+            segments.append(Segment(text, style))
+        strip = Strip(segments, self._width)
+        return strip.crop(round(self.scroll_x), round(self.scroll_x) + self.size.width)
+
+    def watch_cursor_row(self, old: int, new: int) -> None:
+        self.refresh()
+        if new < self.scroll_y:
+            self.scroll_to(y=new, animate=False)
+        elif new >= self.scroll_y + self.size.height:
+            self.scroll_to(y=new - self.size.height + 1, animate=False)
+
+    def _move(self, delta: int) -> None:
+        if self.order:
+            self.cursor_row = max(0, min(len(self.order) - 1, self.cursor_row + delta))
+
+    def action_cursor_up(self) -> None:
+        self._move(-1)
+
+    def action_cursor_down(self) -> None:
+        self._move(1)
+
+    def action_page_up(self) -> None:
+        self._move(-max(self.size.height - 1, 1))
+
+    def action_page_down(self) -> None:
+        self._move(max(self.size.height - 1, 1))
+
+    def action_first(self) -> None:
+        self._move(-len(self.order))
+
+    def action_last(self) -> None:
+        self._move(len(self.order))
+
+    def action_sort(self, key: str) -> None:
+        if key == self.sort_key:
+            self.descending = not self.descending
+        else:
+            self.sort_key, self.descending = key, False
+        self.rebuild()
+
+    def action_select(self) -> None:
+        if self.order:
+            row = self.order[self.cursor_row]
+            self.post_message(self.Selected(self.metrics.store.offer_ids[row]))
+
+
+class CatalogScreen(Screen[str | None]):
+    """Catalog-wide list of offers; dismisses with the selected offer_id."""
+
+    class Synced(Message):
+        """Posted after the catalog store was refreshed from the API."""
+
+    BINDINGS: ClassVar[list[BindingType]] = [
+        Binding("escape", "close", "Назад"),
+        Binding("f5", "sync", "Синхронизировать (F5)"),
+        Binding("ctrl+e", "export", "Экспорт XLSX"),
+        Binding("f6", "swap_focus", "Фокус", show=False),
+    ]
+
+    CSS = """
+    #catalog_header {
+        text-style: bold;
+        background: $accent;
+        color: $text;
+    }
+    #catalog_status {
+        color: $text-muted;
+        height: auto;
+    }
+    CatalogTable {
+        height: 1fr;
+    }
+    """
+
+    def __init__(
+        self,
+        store: CatalogStore,
+        get_client: ClientProvider,
+        purchase_prices: Mapping[str, Decimal] | None = None,
+    ) -> None:
+        super().__init__()
+        self.store = store
+        # The sync shares the app's client (or the lookup server), so bulk
+        # pages are scheduled behind F5, prefetch and live-mode requests.
+        self.get_client = get_client
+        self.purchase_prices = purchase_prices
+        self.metrics = compute_metrics(store, purchase_prices)
+        # The export reads the store from a thread while a sync writes to it
+        # on the event loop, so the two never run at the same time.
+        self._syncing = False
+        self._exporting = False
+
+    def compose(self) -> ComposeResult:
+        yield Input(
+            placeholder="Фильтр, например: margin<10 color=RED", id="catalog_filter"
+        )
+        yield Static(catalog_header_text(), id="catalog_header")
+        yield CatalogTable(self.metrics, id="catalog_table")
+        yield Static("", id="catalog_status")
+        yield Footer()
+
+    def on_mount(self) -> None:
+        self.query_one(CatalogTable).focus()
+        self._update_status()
+
+    def _update_status(self, extra: str = "") -> None:
+        table = self.query_one(CatalogTable)
+        text = (
+            f"Показано {len(table.order)} из {len(self.store)} • "
+            "1–8 — сортировка • Enter — карточка • F5 — синхронизация • Esc — назад"
+        )
+        self.query_one("#catalog_status", Static).update(
+            f"{extra}\n{text}" if extra else text
+        )
+
+    def on_input_submitted(self, event: Input.Submitted) -> None:
+        if event.input.id != "catalog_filter":
+            return
+        table = self.query_one(CatalogTable)
+        try:
+            table.row_filter = parse_filter(self.metrics, event.value)
+        except ValueError as e:
+            self.notify(str(e), severity="error")
+            return
+        table.cursor_row = 0
+        table.rebuild()
+        table.focus()
+        self._update_status()
+
+    def on_catalog_table_selected(self, event: CatalogTable.Selected) -> None:
+        self.dismiss(event.offer_id)
+
+    def action_close(self) -> None:
+        self.dismiss(None)
+
+    def action_swap_focus(self) -> None:
+        filter_input = self.query_one("#catalog_filter", Input)
+        table = self.query_one(CatalogTable)
+        (table if filter_input.has_focus else filter_input).focus()
+
+    def action_export(self) -> None:
+        if self._syncing:
+            self.notify("Дождитесь окончания синхронизации", severity="warning")
+            return
+        if self._exporting:
+            return
+        self._exporting = True
+        self._export(Path.cwd() / f"ozon_report_{get_current_date()}.xlsx")
+
+    def _export_finished(self) -> None:
+        self._exporting = False
+
+    @work(thread=True, exclusive=True, group="catalog_export")
+    def _export(self, path: Path) -> None:
+        try:
+            count = export_store(self.store, path, self.purchase_prices)
+        except OSError as e:
+            self.app.call_from_thread(
+                self.notify, f"Ошибка экспорта: {e}", severity="error"
+            )
+            return
+        finally:
+            self.app.call_from_thread(self._export_finished)
+        self.app.call_from_thread(self.notify, f"Выгружено {count} товаров в {path}")
+
+    def action_sync(self) -> None:
+        if self._exporting:
+            self.notify("Дождитесь окончания экспорта", severity="warning")
+            return
+        self._sync()
+
+    @work(exclusive=True, group="catalog_sync")
+    async def _sync(self) -> None:
+        self._syncing = True
+        try:
+            client = await self.get_client()
+            if client is None:
+                self.notify("Не заданы Client ID или API Key", severity="error")
+                return
+            await self._sync_store(client)
+        finally:
+            self._syncing = False
+
+    async def _sync_store(self, client: APIClient | LookupClient) -> None:
+        self._update_status("Синхронизация…")
+        try:
+            received = await sync_catalog(
+                self.store,
+                client=client,
+                on_progress=lambda n: self._update_status(
+                    f"Синхронизация: получено {n} • {_concurrency_text(client)}"
+                ),
+            )
+        except (FetchError, LookupServerError, OSError, ValueError) as e:
+            self._update_status(f"Ошибка синхронизации: {type(e).__name__}: {e}")
+            return
+
+        save_catalog(self.store)
+        self.post_message(self.Synced())
+        self.metrics = compute_metrics(self.store, self.purchase_prices)
+        self.query_one(CatalogTable).set_metrics(self.metrics)
+        self.query_one("#catalog_filter", Input).value = ""
+        self._update_status(f"Готово: получено {received}")
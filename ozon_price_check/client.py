@@ -1,6 +1,22 @@
+import asyncio
+from collections.abc import AsyncIterator, Sequence
+
+from ozon_price_check.concurrency import Priority
+from ozon_price_check.constants import (
+    LISTING_PARTITIONS,
+    MAX_PARTITION_SHARE,
+    ExternalAPIUrls,
+    ProductVisibility,
+    RequestLimits,
+)
 from ozon_price_check.core_client import APIClient
-from ozon_price_check.constants import ExternalAPIUrls
-from ozon_price_check.schemas import Item, ProductsResponse
+from ozon_price_check.profiling import stage
+from ozon_price_check.schemas import (
+    Item,
+    ProductInfo,
+    ProductInfoResponse,
+    ProductsResponse,
+)
 
 
 class ProductsAPIClient:
@@ -9,8 +25,18 @@ class ProductsAPIClient:
     def __init__(self, client: APIClient):
         self.client = client
 
-    async def get_product_info(self, sku: str) -> Item:
-        """Fetch product information by SKU."""
+    async def get_product_info(
+        self,
+        sku: str,
+        interactive: bool = False,
+        priority: Priority | None = None,
+    ) -> Item:
+        """Fetch product information by SKU.
+
+        Pass ``interactive=True`` for user-facing lookups (hedged requests with
+        a short per-attempt deadline, see ``APIClient.fetch``). ``priority``
+        overrides the limiter class, e.g. ``Priority.PREFETCH``.
+        """
         request_body = {
             "filter": {
                 "offer_id": [sku],
@@ -22,14 +48,208 @@ class ProductsAPIClient:
         products_data = await self.client.fetch(
             url=ExternalAPIUrls.PRODUCT_PRICE_LIST,
             body=request_body,
+            interactive=interactive,
+            priority=priority,
         )
 
         if not products_data:
             raise ValueError(f"Empty response from API for SKU: {sku}")
 
-        price_response = ProductsResponse.model_validate(products_data)
+        with stage("validation"):
+            price_response = ProductsResponse.model_validate(products_data)
 
         if not price_response.items:
             raise ValueError(f"No prices found for SKU: {sku}")
 
         return price_response.items[0]
+
+    async def get_product_prices(
+        self, offer_ids: Sequence[str], priority: Priority | None = None
+    ) -> list[Item]:
+        """Fetch current prices for many SKUs, one request per 1000 offer_ids.
+
+        SKUs without prices are simply missing from the result.
+        """
+        limit = int(RequestLimits.PRODUCT_LIST)
+        responses = await asyncio.gather(
+            *(
+                self.client.fetch(
+                    url=ExternalAPIUrls.PRODUCT_PRICE_LIST,
+                    body={
+                        "filter": {
+                            "offer_id": list(offer_ids[start : start + limit]),
+                            "visibility": "ALL",
+                        },
+                        "limit": limit,
+                    },
+                    priority=priority,
+                )
+                for start in range(0, len(offer_ids), limit)
+            )
+        )
+
+        items: list[Item] = []
+        for products_data in responses:
+            if not products_data:
+                raise ValueError("Empty response from API for prices")
+            with stage("validation"):
+                items.extend(ProductsResponse.model_validate(products_data).items)
+        return items
+
+    async def _price_page(
+        self, visibility: ProductVisibility, cursor: str, limit: int
+    ) -> ProductsResponse:
+        request_body = {
+            "filter": {"visibility": visibility.value},
+            "limit": int(limit),
+            "cursor": cursor,
+        }
+        products_data = await self.client.fetch(
+            url=ExternalAPIUrls.PRODUCT_PRICE_LIST,
+            body=request_body,
+        )
+        if not products_data:
+            raise ValueError("Empty response from API while listing prices")
+
+        with stage("validation"):
+            return ProductsResponse.model_validate(products_data)
+
+    async def _walk_prices(
+        self,
+        visibility: ProductVisibility,
+        limit: int,
+        first: ProductsResponse | None = None,
+    ) -> AsyncIterator[list[Item]]:
+        """Follow the cursor for one filter, optionally from an already fetched page."""
+        page = first or await self._price_page(visibility, "", limit)
+        while page.items:
+            yield page.items
+            if not page.cursor:
+                return
+            page = await self._price_page(visibility, page.cursor, limit)
+
+    async def iter_product_prices(
+        self,
+        visibility: ProductVisibility = ProductVisibility.ALL,
+        limit: int = RequestLimits.PRODUCT_LIST,
+    ) -> AsyncIterator[list[Item]]:
+        """Page through the whole catalog's prices, yielding one page at a time."""
+        async for items in self._walk_prices(visibility, limit):
+            yield items
+
+    async def iter_product_prices_partitioned(
+        self,
+        partitions: Sequence[ProductVisibility] = LISTING_PARTITIONS,
+        limit: int = RequestLimits.PRODUCT_LIST,
+        max_share: float = MAX_PARTITION_SHARE,
+    ) -> AsyncIterator[list[Item]]:
+        """Page through the catalog's prices with one cursor per partition.
+
+        ``partitions`` are visibility filters that should split ``ALL`` into
+        disjoint parts. The first page of ``ALL`` and of every partition are
+        requested together; their ``total`` counts decide the plan:
+
+        * partitions cover ``ALL`` exactly and none holds more than
+          ``max_share`` of it — walk all partitions concurrently, yielding
+          pages in arrival order, de-duplicated by ``product_id`` (a product
+          can move between partitions while the listing runs);
+        * otherwise (unbalanced, overlapping or incomplete partitions, a
+          single page, or a failed partition request) — continue the ``ALL``
+          cursor from its first page, exactly like ``iter_product_prices``.
+        """
+        first_all, *firsts = await asyncio.gather(
+            self._price_page(ProductVisibility.ALL, "", limit),
+            *(self._price_page(part, "", limit) for part in partitions),
+            return_exceptions=True,
+        )
+        if isinstance(first_all, BaseException):
+            raise first_all
+
+        pages = [p for p in firsts if isinstance(p, ProductsResponse)]
+        totals = [p.total for p in pages]
+        balanced = (
+            len(pages) == len(partitions) > 1
+            and first_all.total > limit
+            and sum(totals) == first_all.total
+            and max(totals) <= max_share * first_all.total
+        )
+        if not balanced:
+            async for items in self._walk_prices(
+                ProductVisibility.ALL, limit, first_all
+            ):
+                yield items
+            return
+
+        # Pages, an exception from a failed walk, or None when a walk is done.
+        queue: asyncio.Queue[list[Item] | Exception | None] = asyncio.Queue(
+            maxsize=2 * len(partitions)
+        )
+
+        async def walk(part: ProductVisibility, first: ProductsResponse) -> None:
+            try:
+                async for items in self._walk_prices(part, limit, first):
+                    await queue.put(items)
+            except Exception as e:  # noqa: BLE001 - re-raised by the consumer
+                await queue.put(e)
+            else:
+                await queue.put(None)
+
+        tasks = [
+            asyncio.create_task(walk(part, first))
+            for part, first in zip(partitions, pages)
+        ]
+        seen: set[int] = set()
+        try:
+            running = len(tasks)
+            while running:
+                received = await queue.get()
+                if received is None:
+                    running -= 1
+                    continue
+                if isinstance(received, Exception):
+                    # Fail instead of returning a partial catalog.
+                    raise received
+                fresh = [i for i in received if i.product_id not in seen]
+                seen.update(i.product_id for i in fresh)
+                if fresh:
+                    yield fresh
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def get_product_info_list(
+        self,
+        *,
+        offer_ids: Sequence[str] | None = None,
+        product_ids: Sequence[int] | None = None,
+        interactive: bool = False,
+        priority: Priority | None = None,
+    ) -> list[ProductInfo]:
+        """Fetch product descriptions, requesting all chunks concurrently."""
+        if offer_ids:
+            key, values = "offer_id", list(offer_ids)
+        elif product_ids:
+            key, values = "product_id", [str(pid) for pid in product_ids]
+        else:
+            return []
+
+        limit = int(RequestLimits.PRODUCT_INFO_LIST)
+        responses = await asyncio.gather(
+            *(
+                self.client.fetch(
+                    url=ExternalAPIUrls.PRODUCT_INFO_LIST,
+                    body={key: values[start : start + limit]},
+                    interactive=interactive,
+                    priority=priority,
+                )
+                for start in range(0, len(values), limit)
+            )
+        )
+
+        infos: list[ProductInfo] = []
+        for products_data in responses:
+            if not products_data:
+                raise ValueError("Empty response from API for product info")
+            with stage("validation"):
+                infos.extend(ProductInfoResponse.model_validate(products_data).items)
+        return infos
@@ -0,0 +1,196 @@
+"""Adaptive (AIMD) concurrency limiting for API endpoints."""
+
+import asyncio
+import math
+import time
+from collections import deque
+from enum import IntEnum
+from typing import Any
+
+
+class Priority(IntEnum):
+    """Request classes, most urgent first."""
+
+    INTERACTIVE = 0
+    PREFETCH = 1
+    BULK = 2
+
+
+def _quantile(samples: "deque[float]", q: float) -> float | None:
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, math.ceil(q * len(ordered)) - 1)]
+
+
+class AdaptiveLimiter:
+    """Concurrency limit that adapts to how the endpoint behaves.
+
+    Additive increase: every ``limit`` successful requests with normal latency
+    raise the limit by ``increase``. Multiplicative decrease: an overload
+    signal (429 or 5xx) or a latency spike above ``latency_tolerance``
+    times the baseline multiplies the limit by ``backoff``, at most once per
+    baseline round trip so a burst of failures counts as one event.
+
+    Waiting requests are admitted strictly by ``Priority``. A share of the
+    limit (``interactive_reserve``, at least one slot) is kept free for
+    interactive requests: prefetch and bulk requests are only admitted while
+    fewer than ``limit - reserve`` requests are in flight, so a user lookup
+    never queues behind a full window of background work. At a limit of 1
+    there is no slot to spare: background requests may use the only slot,
+    but none is admitted while an interactive request is queued, so that
+    request waits for at most the one already in flight.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 10,
+        min_limit: int = 1,
+        max_limit: int = 64,
+        increase: float = 1.0,
+        backoff: float = 0.5,
+        latency_tolerance: float = 2.0,
+        sample_size: int = 200,
+        interactive_reserve: float = 0.2,
+    ) -> None:
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.backoff = backoff
+        self.latency_tolerance = latency_tolerance
+        self._limit = float(max(min_limit, min(initial_limit, max_limit)))
+        self._in_flight = 0
+        self.interactive_reserve = interactive_reserve
+        self._waiters: dict[Priority, deque[asyncio.Future[None]]] = {
+            priority: deque() for priority in Priority
+        }
+        self._waits: dict[Priority, deque[float]] = {
+            priority: deque(maxlen=sample_size) for priority in Priority
+        }
+        self._baseline: float | None = None
+        self._last_decrease = 0.0
+        self._latencies: deque[float] = deque(maxlen=sample_size)
+        self.overloads = 0
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def queued(self) -> int:
+        return sum(len(waiters) for waiters in self._waiters.values())
+
+    def latency_quantile(self, q: float) -> float | None:
+        """Latency quantile (seconds) over recent successful requests."""
+        return _quantile(self._latencies, q)
+
+    def capacity(self, priority: Priority) -> int:
+        """How many requests may be in flight when admitting ``priority``."""
+        limit = self.limit
+        if priority == Priority.INTERACTIVE:
+            return limit
+        reserve = max(1, int(limit * self.interactive_reserve))
+        if limit > reserve:
+            return limit - reserve
+        return 0 if self._waiters[Priority.INTERACTIVE] else 1
+
+    def _can_admit(self, priority: Priority) -> bool:
+        if self._in_flight >= self.capacity(priority):
+            return False
+        return not any(self._waiters[p] for p in Priority if p <= priority)
+
+    async def acquire(self, priority: Priority = Priority.BULK) -> None:
+        started = time.monotonic()
+        if self._can_admit(priority):
+            self._in_flight += 1
+            self._waits[priority].append(0.0)
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters[priority].append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just before cancellation.
+                self._in_flight -= 1
+                self._wake()
+            else:
+                self._waiters[priority].remove(waiter)
+            raise
+        self._waits[priority].append(time.monotonic() - started)
+
+    def release(self, latency: float | None = None, overloaded: bool = False) -> None:
+        """Free a slot and feed the outcome of the request into the limit.
+
+        ``latency`` is None when the request finished without a usable
+        measurement (a failed response or a client-side error), which leaves
+        the limit as is.
+        """
+        self._in_flight -= 1
+        if overloaded:
+            self._decrease()
+        elif latency is not None:
+            self._on_success(latency)
+        self._wake()
+
+    def _on_success(self, latency: float) -> None:
+        self._latencies.append(latency)
+        if self._baseline is None:
+            self._baseline = latency
+            return
+
+        if latency > self._baseline * self.latency_tolerance:
+            self._decrease()
+        else:
+            self._limit = min(self.max_limit, self._limit + self.increase / self._limit)
+        # Slow-moving baseline that tracks gradual changes but not spikes.
+        self._baseline += 0.05 * (min(latency, self._baseline * 2) - self._baseline)
+
+    def _decrease(self) -> None:
+        self.overloads += 1
+        now = time.monotonic()
+        if now - self._last_decrease < (self._baseline or 0.0):
+            return
+        self._last_decrease = now
+        self._limit = max(self.min_limit, self._limit * self.backoff)
+
+    def _wake(self) -> None:
+        for priority in Priority:
+            waiters = self._waiters[priority]
+            while waiters and self._in_flight < self.capacity(priority):
+                waiter = waiters.popleft()
+                if not waiter.done():
+                    self._in_flight += 1
+                    waiter.set_result(None)
+            if waiters:
+                # Lower classes must not overtake a class that is still waiting.
+                return
+
+    def stats(self) -> dict[str, Any]:
+        p95 = self.latency_quantile(0.95)
+        return {
+            "limit": self.limit,
+            "in_flight": self._in_flight,
+            "queued": self.queued,
+            "baseline_ms": round(self._baseline * 1000, 1) if self._baseline else None,
+            "p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+            "overloads": self.overloads,
+            "classes": {
+                priority.name.lower(): self._class_stats(priority)
+                for priority in Priority
+            },
+        }
+
+    def _class_stats(self, priority: Priority) -> dict[str, Any]:
+        waits = self._waits[priority]
+        p50, p95 = _quantile(waits, 0.5), _quantile(waits, 0.95)
+        return {
+            "queued": len(self._waiters[priority]),
+            "wait_p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+            "wait_p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+        }
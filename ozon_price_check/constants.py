@@ -29,6 +29,13 @@ class ProductVisibility(str, Enum):
     PARTIAL_APPROVED = "PARTIAL_APPROVED"
 
 
+# Disjoint visibility filters that together cover ``ALL``, used to list the
+# catalog with one cursor per partition (see ``iter_product_prices_partitioned``).
+LISTING_PARTITIONS = (ProductVisibility.VISIBLE, ProductVisibility.INVISIBLE)
+# Above this share of the catalog in one partition, a single cursor is as fast.
+MAX_PARTITION_SHARE = 0.9
+
+
 class RequestLimits(int, Enum):
     PRODUCT_LIST = 1000
     PRODUCT_INFO_LIST = 1000
@@ -1,11 +1,23 @@
 import asyncio
+import time
 from abc import ABC
 from types import TracebackType
-from typing import Any, Optional, Type
+from typing import Any
 
 import httpx
 
+from ozon_price_check.cassette import Cassette, CassetteMiss
+from ozon_price_check.concurrency import AdaptiveLimiter, Priority
 from ozon_price_check.constants import ExternalAPIUrls
+from ozon_price_check.profiling import stage
+
+# Interactive (single-SKU) lookups: per-attempt deadline and hedge delay bounds.
+INTERACTIVE_ATTEMPT_TIMEOUT = 3.0
+DEFAULT_HEDGE_DELAY = 0.5
+MIN_HEDGE_DELAY = 0.05
+# Responses that make the endpoint limiter back off: 429 and any 5xx.
+TOO_MANY_REQUESTS = 429
+SERVER_ERROR = 500
 
 
 class FetchError(Exception):
@@ -21,14 +33,23 @@ class APIClient(ABC):
         api_key: str,
         max_concurrent_requests: int = 10,
         timeout: float = 10.0,
+        cassette: Cassette | None = None,
+        max_concurrency_limit: int = 64,
     ):
-        self._client: Optional[httpx.AsyncClient] = None
-        self._semaphore = asyncio.Semaphore(max_concurrent_requests)
+        self._client: httpx.AsyncClient | None = None
+        # Per-endpoint AIMD limiters; max_concurrent_requests is the starting limit.
+        self._initial_concurrency = max_concurrent_requests
+        self._max_concurrency = max(max_concurrency_limit, max_concurrent_requests)
+        self._limiters: dict[str, AdaptiveLimiter] = {}
         self._timeout = timeout
         self._client_id = client_id
         self._api_key = api_key
+        # Falls back to OZON_CASSETTE/OZON_CASSETTE_MODE, see cassette.py.
+        self._cassette = cassette if cassette is not None else Cassette.from_env()
 
     async def __aenter__(self) -> "APIClient":
+        if self._cassette is not None and self._cassette.replaying:
+            return self
         self._client = httpx.AsyncClient(
             base_url=ExternalAPIUrls.BASE_URL,
             timeout=httpx.Timeout(self._timeout),
@@ -37,12 +58,14 @@ class APIClient(ABC):
 
     async def __aexit__(
         self,
-        exc_type: Optional[Type[BaseException]],
-        exc_val: Optional[BaseException],
-        exc_tb: Optional[TracebackType],
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
     ):
         if self._client:
             await self._client.aclose()
+        if self._cassette is not None:
+            self._cassette.close()
 
     def get_default_headers(self) -> dict[str, Any]:
         return {
@@ -51,38 +74,188 @@ class APIClient(ABC):
             "Content-Type": "application/json",
         }
 
+    def _limiter(self, url: ExternalAPIUrls) -> AdaptiveLimiter:
+        endpoint = str(getattr(url, "value", url))
+        limiter = self._limiters.get(endpoint)
+        if limiter is None:
+            limiter = AdaptiveLimiter(
+                initial_limit=self._initial_concurrency,
+                max_limit=self._max_concurrency,
+            )
+            self._limiters[endpoint] = limiter
+        return limiter
+
+    def metrics(self) -> dict[str, dict[str, Any]]:
+        """Concurrency limit, latency and per-priority queue stats per endpoint."""
+        return {endpoint: lim.stats() for endpoint, lim in self._limiters.items()}
+
     async def fetch(
         self,
         url: ExternalAPIUrls,
-        body: Optional[dict[str, Any]] = None,
+        body: dict[str, Any] | None = None,
         method: str = "POST",
-        headers: Optional[dict[str, Any]] = None,
+        headers: dict[str, Any] | None = None,
+        interactive: bool = False,
+        attempt_timeout: float | None = None,
+        hedge: bool = True,
+        priority: Priority | None = None,
     ) -> Any:
-        """Make an HTTP request to the specified URL."""
+        """Make an HTTP request to the specified URL.
+
+        ``interactive=True`` is meant for user-facing single lookups where tail
+        latency matters: each attempt gets a short deadline
+        (``attempt_timeout``) and, with ``hedge``, a second identical request
+        is sent if the first has not answered after the endpoint's p95
+        latency. The first successful response wins and the other attempt is
+        cancelled. Bulk traffic should use the default mode.
+
+        ``priority`` selects the scheduling class in the endpoint limiter;
+        it defaults to ``INTERACTIVE`` for interactive requests and ``BULK``
+        otherwise.
+        """
+        if self._cassette is not None and self._cassette.replaying:
+            return self._replay(url, body, method)
+
         if not self._client:
             raise RuntimeError("Client is not initialized. Use 'async with'.")
 
         merged_headers = {**self.get_default_headers(), **(headers or {})}
+        if priority is None:
+            priority = Priority.INTERACTIVE if interactive else Priority.BULK
+
+        if interactive:
+            return await self._fetch_hedged(
+                url,
+                body,
+                method,
+                merged_headers,
+                priority,
+                attempt_timeout or INTERACTIVE_ATTEMPT_TIMEOUT,
+                hedge,
+            )
+        return await self._request(url, body, method, merged_headers, priority)
+
+    def _hedge_delay(self, url: ExternalAPIUrls, attempt_timeout: float) -> float:
+        p95 = self._limiter(url).latency_quantile(0.95)
+        delay = DEFAULT_HEDGE_DELAY if p95 is None else p95
+        return min(max(delay, MIN_HEDGE_DELAY), attempt_timeout)
+
+    async def _fetch_hedged(
+        self,
+        url: ExternalAPIUrls,
+        body: dict[str, Any] | None,
+        method: str,
+        headers: dict[str, Any],
+        priority: Priority,
+        attempt_timeout: float,
+        hedge: bool,
+    ) -> Any:
+        def attempt() -> asyncio.Task[Any]:
+            return asyncio.create_task(
+                self._request(url, body, method, headers, priority, attempt_timeout)
+            )
 
-        async with self._semaphore:
-            try:
-                resp = await self._client.request(
-                    method=method.upper(),
-                    url=url,
-                    json=body,
-                    headers=merged_headers,
+        attempts = [attempt()]
+        try:
+            if hedge:
+                done, _ = await asyncio.wait(
+                    attempts, timeout=self._hedge_delay(url, attempt_timeout)
                 )
+                # A hedge covers a slow attempt only; a fast failure (4xx,
+                # 429) is reported as is rather than repeated at once.
+                if not done:
+                    attempts.append(attempt())
 
-                resp.raise_for_status()
-                return resp.json()
+            pending = set(attempts)
+            error: BaseException | None = None
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            assert error is not None
+            raise error
+        finally:
+            for task in attempts:
+                task.cancel()
 
-            except httpx.HTTPStatusError as e:
-                text = e.response.text
-                msg = f"Request failed (url={url}, body={body}), status={e.response.status_code}, response={text}"
-                raise FetchError(msg)
+    async def _request(
+        self,
+        url: ExternalAPIUrls,
+        body: dict[str, Any] | None,
+        method: str,
+        merged_headers: dict[str, Any],
+        priority: Priority = Priority.BULK,
+        timeout: float | None = None,
+    ) -> Any:
+        limiter = self._limiter(url)
+        await limiter.acquire(priority)
+        started = time.monotonic()
+        latency: float | None = None
+        overloaded = False
+        try:
+            # httpx timeouts apply per network operation; ``timeout`` is a
+            # deadline for the whole attempt.
+            with stage("network"):
+                resp = await asyncio.wait_for(
+                    self._client.request(
+                        method=method.upper(),
+                        url=url,
+                        json=body,
+                        headers=merged_headers,
+                    ),
+                    timeout,
+                )
+            # Only a successful response is a latency sample; other client
+            # errors (4xx) leave the limit as is.
+            status = resp.status_code
+            overloaded = status == TOO_MANY_REQUESTS or status >= SERVER_ERROR
+            if resp.is_success:
+                latency = time.monotonic() - started
 
-            except httpx.RequestError as e:
-                msg = (
-                    f"HTTP client error for request url={url} body={body}. Details: {e}"
+            if self._cassette is not None:
+                self._cassette.record(
+                    method,
+                    url,
+                    body,
+                    resp.status_code,
+                    resp.json() if resp.is_success else resp.text,
                 )
-                raise FetchError(msg)
+            resp.raise_for_status()
+            return resp.json()
+
+        except httpx.HTTPStatusError as e:
+            text = e.response.text
+            msg = f"Request failed (url={url}, body={body}), status={e.response.status_code}, response={text}"
+            raise FetchError(msg)
+
+        except httpx.RequestError as e:
+            msg = f"HTTP client error for request url={url} body={body}. Details: {e}"
+            raise FetchError(msg)
+
+        except TimeoutError:
+            # A missed deadline is a slow attempt, not a sign of overload.
+            msg = f"Request deadline of {timeout}s exceeded (url={url}, body={body})"
+            raise FetchError(msg)
+
+        finally:
+            limiter.release(latency, overloaded)
+
+    def _replay(
+        self, url: ExternalAPIUrls, body: dict[str, Any] | None, method: str
+    ) -> Any:
+        assert self._cassette is not None
+        try:
+            recorded = self._cassette.play(method, url, body)
+        except CassetteMiss as e:
+            raise FetchError(f"Request not found in cassette: {e}")
+
+        status = recorded["status"]
+        if status >= 400:
+            text = recorded["response"]
+            msg = f"Request failed (url={url}, body={body}), status={status}, response={text}"
+            raise FetchError(msg)
+        return recorded["response"]
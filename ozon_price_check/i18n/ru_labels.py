@@ -54,6 +54,12 @@ RU_LABELS = {
     "current_period_to": "Текущий период по",
     "actions": "Акции",
     
+    # ProductInfo
+    "name": "Название",
+    "barcodes": "Штрихкоды",
+    "stock_present": "Остаток",
+    "stock_reserved": "Резерв",
+    
     # Computed fields
     "fbs_commission_without_percent": "FBS комиссия без процента",
     "fbo_commission_without_percent": "FBO комиссия без процента",
@@ -68,6 +74,22 @@ RU_LABELS = {
     "total_commission": "Общая комиссия",
     "profit": "Прибыль",
     "profit_margin": "Рентабельность",
+    "fbs_profit": "FBS прибыль",
+    "fbs_profit_margin": "FBS рентабельность",
+    "fbo_profit": "FBO прибыль",
+    "fbo_profit_margin": "FBO рентабельность",
+
+    # FBS vs FBO comparison
+    "fbs_commission_min": "FBS комиссия (мин.)",
+    "fbo_commission_min": "FBO комиссия (мин.)",
+    "fbs_profit_best": "FBS прибыль (макс.)",
+    "fbs_profit_margin_best": "FBS рентабельность (макс.)",
+    "fbo_profit_best": "FBO прибыль (макс.)",
+    "fbo_profit_margin_best": "FBO рентабельность (макс.)",
+    "fbo_gain": "Выгода FBO",
+    "fbo_gain_min": "Выгода FBO (мин.)",
+    "fbo_gain_max": "Выгода FBO (макс.)",
+    "recommended_scheme": "Рекомендуемая схема",
 }
 
 
@@ -0,0 +1,366 @@
+"""Local lookup server shared by several TUI instances.
+
+``price-check serve`` listens on a Unix socket and answers lookups with one
+long-lived ``APIClient`` (one connection pool and one set of per-endpoint
+limiters for the seller account) and a shared short-lived cache. Concurrent
+lookups of the same SKU are merged into a single API call.
+
+The protocol is JSON lines: each request is one object with a ``method``,
+each response one object with either ``result`` or ``error``::
+
+    {"method": "lookup", "sku": "SKU-1"}
+    {"method": "lookup", "sku": "SKU-1", "priority": "prefetch"}
+    {"method": "lookup_many", "skus": ["SKU-1", "SKU-2"]}
+    {"method": "prices", "skus": ["SKU-1", "SKU-2"]}
+    {"method": "catalog"}
+    {"method": "stats"}
+
+``catalog`` streams the whole catalog at bulk priority: one ``{"page": [...]}``
+line per page, then ``result`` (the number of items) or ``error``.
+
+The TUI uses the server when ``OZON_LOOKUP_SOCKET`` points to it or when the
+default socket exists, and falls back to direct API calls otherwise.
+"""
+
+import asyncio
+import json
+import os
+import time
+from collections.abc import AsyncIterator
+from pathlib import Path
+from typing import Any, Optional
+
+from platformdirs import user_runtime_dir
+
+from .client import ProductsAPIClient
+from .concurrency import Priority
+from .core_client import APIClient, FetchError
+from .profiling import stage
+from .schemas import Item, ProductInfo
+from .services.enrichment import (
+    EnrichedItem,
+    fetch_enriched_item,
+    iter_enriched_prices,
+)
+
+LOOKUP_SOCKET_ENV = "OZON_LOOKUP_SOCKET"
+DEFAULT_CACHE_TTL = 30.0
+MAX_CACHE_ENTRIES = 50_000
+# Batch responses are single JSON lines and can be large.
+STREAM_LIMIT = 64 * 1024 * 1024
+
+
+class LookupServerError(Exception):
+    """Raised by ``LookupClient`` when the server reports an error."""
+
+
+def default_socket_path() -> Path:
+    return Path(user_runtime_dir("price-check", "kashikuroni")) / "lookup.sock"
+
+
+def _encode(enriched: EnrichedItem) -> dict[str, Any]:
+    item, info = enriched
+    return {
+        "item": item.model_dump(mode="json"),
+        "info": info.model_dump(mode="json") if info is not None else None,
+    }
+
+
+def _decode(payload: dict[str, Any]) -> EnrichedItem:
+    info = payload.get("info")
+    with stage("validation"):
+        return (
+            Item.model_validate(payload["item"]),
+            ProductInfo.model_validate(info) if info is not None else None,
+        )
+
+
+class LookupServer:
+    """Serves cached, de-duplicated lookups for one ``APIClient``."""
+
+    def __init__(self, client: APIClient, cache_ttl: float = DEFAULT_CACHE_TTL):
+        self.client = client
+        self.cache_ttl = cache_ttl
+        self._cache: dict[str, tuple[float, dict[str, Any]]] = {}
+        # In-flight lookups by SKU with the priority they were issued at.
+        self._inflight: dict[str, tuple[Priority, asyncio.Future[dict[str, Any]]]] = {}
+        # Prices only (live mode), cached separately from full lookups.
+        self._price_cache: dict[str, tuple[float, dict[str, Any]]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.clients = 0
+
+    async def lookup(
+        self,
+        sku: str,
+        interactive: bool = True,
+        priority: Priority | None = None,
+    ) -> dict[str, Any]:
+        """Return the encoded (item, info) pair for ``sku``, cached for ``cache_ttl``.
+
+        A lookup joins one already in flight for the same SKU unless that one
+        runs at a less urgent priority; then it issues its own request, which
+        later lookups join instead.
+        """
+        if priority is None:
+            priority = Priority.INTERACTIVE if interactive else Priority.BULK
+        cached = self._cache.get(sku)
+        if cached is not None and cached[0] > time.monotonic():
+            self.hits += 1
+            return cached[1]
+
+        pending = self._inflight.get(sku)
+        if pending is not None and pending[0] <= priority:
+            self.hits += 1
+            try:
+                return await asyncio.shield(pending[1])
+            except asyncio.CancelledError:
+                if not pending[1].cancelled():
+                    raise
+                # The owner was cancelled (its client went away): fetch here.
+        return await self._fetch(sku, interactive, priority)
+
+    async def _fetch(
+        self, sku: str, interactive: bool, priority: Priority
+    ) -> dict[str, Any]:
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[sku] = (priority, future)
+        try:
+            result = _encode(
+                await fetch_enriched_item(
+                    sku,
+                    client=self.client,
+                    interactive=interactive,
+                    priority=priority,
+                )
+            )
+        except asyncio.CancelledError:
+            # Waiters see the cancelled future and fetch for themselves.
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so waiter-less failures are not logged as unhandled.
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            self._store(sku, result)
+            return result
+        finally:
+            if self._inflight.get(sku, (priority, None))[1] is future:
+                del self._inflight[sku]
+
+    def _store(self, sku: str, result: dict[str, Any]) -> None:
+        now = time.monotonic()
+        if len(self._cache) >= MAX_CACHE_ENTRIES:
+            self._cache = {k: v for k, v in self._cache.items() if v[0] > now}
+        self._cache[sku] = (now + self.cache_ttl, result)
+
+    async def lookup_many(self, skus: list[str]) -> list[dict[str, Any]]:
+        """Look up many SKUs at bulk priority; failures are returned per SKU."""
+        results = await asyncio.gather(
+            *(self.lookup(sku, interactive=False) for sku in skus),
+            return_exceptions=True,
+        )
+        return [
+            {"error": f"{type(r).__name__}: {r}"} if isinstance(r, Exception) else r
+            for r in results
+        ]
+
+    async def prices(self, skus: list[str]) -> list[dict[str, Any]]:
+        """Current price items for ``skus``; unknown SKUs are left out.
+
+        SKUs missing from the cache are fetched in one batched prices request
+        at prefetch priority, without product info.
+        """
+        now = time.monotonic()
+        results: list[dict[str, Any]] = []
+        missing: list[str] = []
+        for sku in dict.fromkeys(skus):
+            cached = self._price_cache.get(sku)
+            if cached is not None and cached[0] > now:
+                self.hits += 1
+                results.append(cached[1])
+            else:
+                missing.append(sku)
+        if not missing:
+            return results
+
+        self.misses += len(missing)
+        items = await ProductsAPIClient(self.client).get_product_prices(
+            missing, priority=Priority.PREFETCH
+        )
+        now = time.monotonic()
+        if len(self._price_cache) >= MAX_CACHE_ENTRIES:
+            self._price_cache = {
+                k: v for k, v in self._price_cache.items() if v[0] > now
+            }
+        for item in items:
+            encoded = item.model_dump(mode="json")
+            self._price_cache[item.offer_id] = (now + self.cache_ttl, encoded)
+            results.append(encoded)
+        return results
+
+    async def catalog(self) -> AsyncIterator[list[dict[str, Any]]]:
+        """The whole catalog as pages of encoded (item, info) pairs.
+
+        Runs on the shared client at bulk priority, so a sync from any TUI
+        uses the same limiters as everybody's lookups and yields to them.
+        """
+        async for page in iter_enriched_prices(client=self.client):
+            yield [_encode(enriched) for enriched in page]
+
+    async def _stream_catalog(self, writer: asyncio.StreamWriter) -> int:
+        received = 0
+        async for page in self.catalog():
+            received += len(page)
+            writer.write(
+                json.dumps({"page": page}, ensure_ascii=False).encode() + b"\n"
+            )
+            await writer.drain()
+        return received
+
+    def stats(self) -> dict[str, Any]:
+        now = time.monotonic()
+        return {
+            "clients": self.clients,
+            "cache_size": sum(
+                1 for expires, _ in self._cache.values() if expires > now
+            ),
+            "cache_hits": self.hits,
+            "cache_misses": self.misses,
+            "endpoints": self.client.metrics(),
+        }
+
+    async def _dispatch(self, request: dict[str, Any]) -> Any:
+        method = request.get("method")
+        if method == "lookup":
+            if request.get("priority") == Priority.PREFETCH.name.lower():
+                return await self.lookup(
+                    str(request["sku"]), interactive=False, priority=Priority.PREFETCH
+                )
+            return await self.lookup(str(request["sku"]))
+        if method == "lookup_many":
+            return await self.lookup_many([str(sku) for sku in request["skus"]])
+        if method == "prices":
+            return await self.prices([str(sku) for sku in request["skus"]])
+        if method == "stats":
+            return self.stats()
+        raise ValueError(f"Unknown method: {method!r}")
+
+    async def handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        self.clients += 1
+        try:
+            while line := await reader.readline():
+                try:
+                    request = json.loads(line)
+                    if request.get("method") == "catalog":
+                        result = await self._stream_catalog(writer)
+                    else:
+                        result = await self._dispatch(request)
+                    response = {"result": result}
+                except (FetchError, OSError, KeyError, TypeError, ValueError) as e:
+                    response = {"error": f"{type(e).__name__}: {e}"}
+                writer.write(json.dumps(response, ensure_ascii=False).encode() + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.clients -= 1
+            writer.close()
+
+    async def serve(self, path: Path) -> None:
+        """Listen on the Unix socket at ``path`` until cancelled."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if path.is_socket():
+            path.unlink()
+        server = await asyncio.start_unix_server(
+            self.handle, path=str(path), limit=STREAM_LIMIT
+        )
+        # Owner and group only: the socket proxies the seller account.
+        os.chmod(path, 0o660)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            path.unlink(missing_ok=True)
+
+
+class LookupClient:
+    """Thin client for ``LookupServer``; one connection per call."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+
+    @classmethod
+    def from_env(cls) -> Optional["LookupClient"]:
+        """Client for ``OZON_LOOKUP_SOCKET`` or the default socket, if present."""
+        configured = os.environ.get(LOOKUP_SOCKET_ENV)
+        path = Path(configured) if configured else default_socket_path()
+        return cls(path) if path.is_socket() else None
+
+    async def _send(
+        self, method: str, **params: Any
+    ) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        reader, writer = await asyncio.open_unix_connection(
+            str(self.path), limit=STREAM_LIMIT
+        )
+        request = {"method": method, **params}
+        writer.write(json.dumps(request, ensure_ascii=False).encode() + b"\n")
+        await writer.drain()
+        return reader, writer
+
+    @staticmethod
+    def _response(line: bytes) -> dict[str, Any]:
+        if not line:
+            raise ConnectionError("Lookup server closed the connection")
+        response = json.loads(line)
+        if "error" in response:
+            raise LookupServerError(response["error"])
+        return response
+
+    async def call(self, method: str, **params: Any) -> Any:
+        with stage("lookup_server"):
+            reader, writer = await self._send(method, **params)
+            try:
+                line = await reader.readline()
+            finally:
+                writer.close()
+        return self._response(line)["result"]
+
+    async def fetch_enriched_item(
+        self, sku: str, prefetch: bool = False
+    ) -> EnrichedItem:
+        """Look up one SKU; ``prefetch=True`` runs it at prefetch priority."""
+        if prefetch:
+            return _decode(await self.call("lookup", sku=sku, priority="prefetch"))
+        return _decode(await self.call("lookup", sku=sku))
+
+    async def iter_enriched_prices(self) -> AsyncIterator[list[EnrichedItem]]:
+        """Stream the catalog through the server, see ``LookupServer.catalog``."""
+        reader, writer = await self._send("catalog")
+        try:
+            while "page" in (response := self._response(await reader.readline())):
+                yield [_decode(payload) for payload in response["page"]]
+        finally:
+            writer.close()
+
+    async def fetch_prices(self, skus: list[str]) -> list[Item]:
+        """Price items only, batched on the server; unknown SKUs are left out."""
+        results = await self.call("prices", skus=skus)
+        with stage("validation"):
+            return [Item.model_validate(result) for result in results]
+
+    async def stats(self) -> dict[str, Any]:
+        return await self.call("stats")
+
+
+async def run_server(
+    path: Path, client_id: int, api_key: str, cache_ttl: float = DEFAULT_CACHE_TTL
+) -> None:
+    async with APIClient(client_id=client_id, api_key=api_key) as client:
+        await LookupServer(client, cache_ttl).serve(path)
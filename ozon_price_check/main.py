@@ -1,30 +1,94 @@
-from pathlib import Path
+import argparse
+import asyncio
+import math
+import time
+from datetime import datetime
 from decimal import Decimal, InvalidOperation
+from pathlib import Path
 from typing import Any
 
 from pydantic import ValidationError
+from rich.table import Table
 from textual.app import App, ComposeResult
 from textual.binding import Binding
 from textual.containers import Container, ScrollableContainer
-from textual.widgets import Header, Footer, Input, Static, DataTable
-
-from ozon_price_check.core_client import APIClient
+from textual.coordinate import Coordinate
+from textual.timer import Timer
+from textual.widgets import DataTable, Footer, Header, Input, OptionList, Static
+from textual.widgets.option_list import Option
+
+from ozon_price_check.catalog import from_fixed
+from ozon_price_check.catalog_screen import CatalogScreen
+from ozon_price_check.core_client import APIClient, FetchError
 from ozon_price_check.credentials import load_credentials
+from ozon_price_check.lookup_server import (
+    LookupClient,
+    LookupServerError,
+    default_socket_path,
+    run_server,
+)
 from ozon_price_check.onboarding import OnboardingScreen
-from ozon_price_check.services.products import fetch_product_data, Section
+from ozon_price_check.profiling import (
+    Profiler,
+    maybe_profile,
+    profiling_requested,
+    stage,
+)
+from ozon_price_check.search_index import SkuSearchIndex
+from ozon_price_check.services.catalog import load_catalog, save_catalog
+from ozon_price_check.services.export import (
+    export_catalog,
+    export_store,
+    open_report_writer,
+)
+from ozon_price_check.services.fulfilment import analyze_fulfilment, fulfilment_header
+from ozon_price_check.services.live import (
+    LiveCard,
+    LiveWatch,
+    live_interval,
+    poll_prices,
+)
+from ozon_price_check.services.prefetch import (
+    PREFETCH_DEBOUNCE,
+    PrefetchCache,
+    PrefetchedCard,
+    looks_like_offer_id,
+    prefetch_card,
+)
+from ozon_price_check.services.products import (
+    Section,
+    fetch_product_data,
+    product_data,
+    sections_from_item,
+)
+from ozon_price_check.services.purchase_prices import PurchasePriceRegistry
+from ozon_price_check.services.sensitivity import (
+    BAND_COLORS,
+    GridSpec,
+    SensitivityGrid,
+    grid_for_item,
+    grid_from_store,
+    write_sensitivity,
+)
+from ozon_price_check.utils import parse_price
 
 BASE_DIR = Path(__file__).resolve().parent.parent
-
-
-def parse_price(user_input: str) -> Decimal:
-    """Parse price input accepting both comma and dot as decimal separator."""
-    s = (user_input or "").strip()
-    if not s:
-        raise InvalidOperation("empty")
-    if "," in s and "." in s:
-        raise InvalidOperation("both separators")
-    s = s.replace(",", ".")
-    return Decimal(s)
+# Heatmap cell style per margin band (``sensitivity.BAND_COLORS``).
+HEATMAP_STYLES = dict(
+    zip(
+        BAND_COLORS,
+        (
+            "black on red",
+            "black on dark_orange",
+            "black on yellow",
+            "black on pale_green3",
+            "black on green3",
+        ),
+    )
+)
+TUI_GRID = GridSpec(price_steps=9, purchase_steps=5)
+# How long the result of probing the shared lookup server is reused, seconds.
+LOOKUP_PROBE_TTL = 30.0
 
 
 class SectionTable(Static):
@@ -65,6 +129,35 @@ class ProductSections(ScrollableContainer):
         for child in list(self.children):
             child.remove()
 
+    def update_sections(self, sections: list[Section]) -> int | None:
+        """Update only the changed values in place; returns how many changed.
+
+        Returns None without touching anything if the sections or their rows
+        differ from the shown ones; the caller then remounts with
+        ``show_sections``.
+        """
+        tables = list(self.query(SectionTable))
+        if len(tables) != len(sections) or any(
+            table.table is None
+            or table.section["title"] != section["title"]
+            or [label for label, _ in table.section["rows"]]
+            != [label for label, _ in section["rows"]]
+            for table, section in zip(tables, sections)
+        ):
+            return None
+
+        changed = 0
+        for table, section in zip(tables, sections):
+            assert table.table is not None
+            for row, ((_, old), (_, new)) in enumerate(
+                zip(table.section["rows"], section["rows"])
+            ):
+                if old != new:
+                    table.table.update_cell_at(Coordinate(row, 1), new)
+                    changed += 1
+            table.section = section
+        return changed
+
 
 class MessagePanel(Static):
     """Panel for displaying errors/messages in the right column."""
@@ -84,9 +177,61 @@ class MessagePanel(Static):
         self.update("")
 
 
+class SensitivityPanel(Static):
+    """Heatmap of profit and margin over candidate sale and purchase prices."""
+
+    def show_grid(self, grid: SensitivityGrid) -> None:
+        spec = grid.spec
+        table = Table(
+            title=f"Прибыль (рентабельность) для {grid.offer_ids[0]}, "
+            f"±{spec.span * 100:.0f}%",
+            expand=True,
+        )
+        table.add_column("Цена / закупка", justify="right")
+        for j in range(spec.purchase_steps):
+            table.add_column(f"{grid.purchase(0, j):.2f}", justify="right")
+        for i in range(spec.price_steps):
+            cells = []
+            for j in range(spec.purchase_steps):
+                profit, margin = grid.cell(0, i, j)
+                cells.append(
+                    f"[{HEATMAP_STYLES[BAND_COLORS[grid.band(0, i, j)]]}]"
+                    f"{profit:.0f} ({margin:.0f}%)[/]"
+                )
+            table.add_row(f"{grid.price(0, i):.2f}", *cells)
+        self.remove_class("hidden")
+        self.update(table)
+
+    def hide(self) -> None:
+        self.add_class("hidden")
+        self.update("")
+
+
+class SkuSuggestions(OptionList):
+    """Autocomplete list shown under the SKU input while typing."""
+
+    def show_suggestions(self, index: SkuSearchIndex, query: str) -> None:
+        suggestions = index.suggest(query) if query.strip() else []
+        self.clear_options()
+        if not suggestions or (
+            len(suggestions) == 1 and suggestions[0].offer_id == query.strip()
+        ):
+            self.add_class("hidden")
+            return
+        self.add_options(
+            Option(f"{s.offer_id} — {s.name}" if s.name else s.offer_id, id=s.offer_id)
+            for s in suggestions
+        )
+        self.remove_class("hidden")
+
+
 class AppTUI(App):
     """Micro TUI for quick SKU and price input and product information display."""
 
+    def __init__(self, live_interval: float | None = None) -> None:
+        super().__init__()
+        self.live_interval = live_interval
+
     CSS = """
     #main {
         layout: horizontal;
@@ -119,15 +264,29 @@ class AppTUI(App):
         height: auto;
         padding-top: 1;
     }
+    #live_status {
+        color: $text-muted;
+        height: auto;
+    }
+    #sku_suggestions {
+        max-height: 10;
+        margin: 0 0 1 0;
+    }
     .hidden { display: none; }
     #msg.error { border: round $error; color: $error; }
     """
 
     BINDINGS = [
         Binding("f5", "query", "Запрос (F5)", show=True),
+        Binding("f2", "catalog", "Каталог (F2)", show=True),
         Binding("escape", "clear_inputs", "Очистить ввод", show=False),
         Binding("ctrl+l", "clear_card", "Очистить карточку", show=False),
         Binding("f6", "swap_focus", "Фокус", show=False),
+        Binding("f8", "toggle_live", "Авто-обновление (F8)", show=True),
+        Binding("f4", "toggle_pin", "Закрепить артикул", show=False),
+        Binding("f3", "toggle_sensitivity", "Чувствительность (F3)", show=True),
+        Binding("f9", "profile_next", "Профилировать F5", show=False),
+        Binding("down", "focus_suggestions", show=False),
         Binding("ctrl+c", "quit", "Выход", show=False),
     ]
 
@@ -137,24 +296,133 @@ class AppTUI(App):
             with Container(id="left"):
                 yield Static("Ввод", classes="title")
                 yield Input(placeholder="Артикул", id="sku")
+                yield SkuSuggestions(id="sku_suggestions", classes="hidden")
                 yield Input(placeholder="Цена (запятая или точка)", id="price")
                 yield Static(
-                    "Hotkeys: F5 — получить данные • Tab — смена поля • Esc — очистить ввод • Ctrl+L — очистить карточку",
+                    "Hotkeys: F5 — получить данные • F2 — каталог • F8 — авто-обновление • F4 — закрепить артикул • F3 — чувствительность прибыли • F9 — профилировать F5 • Tab — смена поля • Esc — очистить ввод • Ctrl+L — очистить карточку",
                     id="help",
                 )
             with Container(id="right"):
                 yield Static("Информация о товаре", classes="title")
+                yield Static("", id="live_status", classes="hidden")
                 yield MessagePanel(id="msg", classes="hidden")
+                yield SensitivityPanel(id="sensitivity", classes="hidden")
                 yield ProductSections(id="sections")
         yield Footer()
 
     async def on_mount(self) -> None:
+        self.catalog = load_catalog()
+        self._profile_next = False
+        self.prefetch = PrefetchCache()
+        self._prefetch_timer: Timer | None = None
+        # One client for prefetches and lookups, so connections and the
+        # per-endpoint limiters (with their latency stats) are shared.
+        self._api_client: APIClient | None = None
+        self._api_client_key: tuple[int, str] | None = None
+        self._client_lock = asyncio.Lock()
+        self._lookup_probe: tuple[float, LookupClient | None] | None = None
+        self.purchase_prices = PurchasePriceRegistry()
+        # Live mode: the shown card, pinned SKUs and the polling timer.
+        self.live_interval = live_interval(self.live_interval)
+        self.live_card: LiveCard | None = None
+        self.pinned: set[str] = set()
+        self.live_watch = LiveWatch()
+        self._live_timer: Timer | None = None
+        self._live_polling = False
+        self._live_refreshed = datetime.now()
+        self._live_changes = ""
+        self.search_index = SkuSearchIndex()
+        # Offers indexed while the full index is built, replayed after the swap.
+        self._index_backlog: list[tuple[str, str | None]] | None = []
+        self.run_worker(self._build_search_index, thread=True, group="search_index")
         # Если учётки не сохранены — показ онбординга
         creds = load_credentials()
         if not (creds.api_key and creds.client_id):
             await self.push_screen(OnboardingScreen())
         self.query_one("#sku", Input).focus()
 
+    async def on_unmount(self) -> None:
+        self.prefetch.clear()
+        self.purchase_prices.close()
+        if self._api_client is not None:
+            await self._api_client.__aexit__(None, None, None)
+            self._api_client = None
+
+    def _build_search_index(self) -> None:
+        # Built off the UI thread and swapped in whole, so typing stays responsive.
+        index = SkuSearchIndex()
+        index.extend(zip(self.catalog.offer_ids, self._catalog_names()))
+        self.call_from_thread(self._swap_search_index, index)
+
+    def _swap_search_index(self, index: SkuSearchIndex) -> None:
+        for offer_id, name in self._index_backlog or ():
+            index.add(offer_id, name)
+        self._index_backlog = None
+        self.search_index = index
+
+    def _index_offer(self, offer_id: str, name: str | None) -> None:
+        self.search_index.add(offer_id, name)
+        if self._index_backlog is not None:
+            self._index_backlog.append((offer_id, name))
+
+    def _catalog_names(self) -> list[str | None]:
+        return [name or None for name in self.catalog.names]
+
+    def on_catalog_screen_synced(self, event: CatalogScreen.Synced) -> None:
+        for offer_id, name in zip(self.catalog.offer_ids, self._catalog_names()):
+            self._index_offer(offer_id, name)
+
+    def on_input_changed(self, event: Input.Changed) -> None:
+        if event.input.id == "sku":
+            self._clear_price()
+            self.query_one(SkuSuggestions).show_suggestions(
+                self.search_index, event.value
+            )
+            self._schedule_prefetch(event.value)
+
+    def _clear_price(self) -> None:
+        # A typed price belongs to the SKU it was typed for: F5 saves it to
+        # the registry, so it must not carry over to another SKU.
+        price = self.query_one("#price", Input)
+        if price.value:
+            with price.prevent(Input.Changed):
+                price.value = ""
+
+    def _schedule_prefetch(self, value: str) -> None:
+        """Prefetch the card once the SKU input stops changing for a moment."""
+        if self._prefetch_timer is not None:
+            self._prefetch_timer.stop()
+        self._prefetch_timer = self.set_timer(
+            PREFETCH_DEBOUNCE, lambda: self._start_prefetch(value)
+        )
+
+    def _start_prefetch(self, value: str) -> None:
+        if looks_like_offer_id(value, self.search_index):
+            self.prefetch.start(value.strip(), self._prefetch_card)
+
+    async def _prefetch_card(self, sku: str) -> PrefetchedCard:
+        client = await self._client()
+        if client is None:
+            raise RuntimeError("No credentials for prefetch")
+        return await prefetch_card(sku, client=client)
+
+    def on_option_list_option_selected(self, event: OptionList.OptionSelected) -> None:
+        if event.option_list.id != "sku_suggestions" or event.option.id is None:
+            return
+        sku_inp = self.query_one("#sku", Input)
+        with sku_inp.prevent(Input.Changed):
+            sku_inp.value = event.option.id
+        self._clear_price()
+        event.option_list.add_class("hidden")
+        self._schedule_prefetch(event.option.id)
+        self.query_one("#price", Input).focus()
+
+    def action_focus_suggestions(self) -> None:
+        suggestions = self.query_one(SkuSuggestions)
+        if self.query_one("#sku", Input).has_focus and suggestions.option_count:
+            suggestions.focus()
+            suggestions.highlighted = 0
+
     def action_swap_focus(self) -> None:
         sku = self.query_one("#sku", Input)
         price = self.query_one("#price", Input)
@@ -169,9 +437,251 @@ class AppTUI(App):
 
     def action_clear_card(self) -> None:
         self.query_one(ProductSections).clear_sections()
+        self.query_one(SensitivityPanel).hide()
+        self.live_card = None
+        self._update_live_status()
         self.notify("Карточка очищена", timeout=1.2)
 
+    def action_catalog(self) -> None:
+        # The app-level F2 binding stays active on the catalog screen.
+        if isinstance(self.screen, CatalogScreen):
+            return
+        self.purchase_prices.refresh()
+        self.push_screen(
+            CatalogScreen(self.catalog, self._client, self.purchase_prices),
+            callback=self._open_catalog_item,
+        )
+
+    def _open_catalog_item(self, offer_id: str | None) -> None:
+        """Show the card for an offer selected on the catalog screen."""
+        if offer_id is None:
+            return
+        row = self.catalog.row_of(offer_id)
+        if row is None:
+            return
+        item = self.catalog.materialize(row)
+
+        sku_inp = self.query_one("#sku", Input)
+        if sku_inp.value.strip() != offer_id:
+            with sku_inp.prevent(Input.Changed):
+                sku_inp.value = offer_id
+            self._clear_price()
+        # The registry wins; a typed price is used only for this SKU and only
+        # when nothing is stored yet.
+        user_purchase_price = self.purchase_prices.get(offer_id)
+        if user_purchase_price is None:
+            try:
+                user_purchase_price = parse_price(self.query_one("#price", Input).value)
+            except InvalidOperation:
+                pass
+
+        sections_view = self.query_one(ProductSections)
+        self.query_one("#msg", MessagePanel).hide()
+        sections_view.remove_class("hidden")
+        info = self.catalog.product_info(row)
+        sections_view.show_sections(sections_from_item(item, user_purchase_price, info))
+        self._set_live_card(LiveCard(item, info, user_purchase_price))
+        sku_inp.focus()
+
+    async def _lookup_client(self) -> LookupClient | None:
+        """Client for a running shared lookup server, or None to call OZON directly.
+
+        The server is probed at most once per ``LOOKUP_PROBE_TTL`` seconds, not
+        before every lookup.
+        """
+        probe = self._lookup_probe
+        if probe is not None and time.monotonic() - probe[0] < LOOKUP_PROBE_TTL:
+            return probe[1]
+        lookup = LookupClient.from_env()
+        if lookup is not None:
+            try:
+                await asyncio.wait_for(lookup.stats(), 1.0)
+            except (TimeoutError, OSError, LookupServerError):
+                lookup = None
+        self._lookup_probe = (time.monotonic(), lookup)
+        return lookup
+
+    async def _client(self) -> APIClient | LookupClient | None:
+        """Shared lookup server if running, else the app's own API client.
+
+        Returns None when there are no saved credentials.
+        """
+        lookup = await self._lookup_client()
+        if lookup is not None:
+            return lookup
+        creds = load_credentials()
+        if not (creds.api_key and creds.client_id):
+            return None
+        key = (creds.client_id, creds.api_key)
+        async with self._client_lock:
+            if self._api_client is None or self._api_client_key != key:
+                if self._api_client is not None:
+                    await self._api_client.__aexit__(None, None, None)
+                client = APIClient(client_id=creds.client_id, api_key=creds.api_key)
+                self._api_client = await client.__aenter__()
+                self._api_client_key = key
+            return self._api_client
+
+    def _set_live_card(self, card: LiveCard) -> None:
+        self.live_card = card
+        self.live_watch.seed(card.item)
+        self._live_refreshed = datetime.now()
+        self._live_changes = ""
+        self._update_live_status()
+        self._update_sensitivity()
+
+    def _update_sensitivity(self) -> None:
+        panel = self.query_one(SensitivityPanel)
+        card = self.live_card
+        if panel.has_class("hidden"):
+            return
+        if card is None or not card.purchase_price:
+            panel.hide()
+            return
+        panel.show_grid(grid_for_item(card.item, card.purchase_price, TUI_GRID))
+
+    def action_toggle_sensitivity(self) -> None:
+        panel = self.query_one(SensitivityPanel)
+        if not panel.has_class("hidden"):
+            panel.hide()
+            return
+        card = self.live_card
+        if card is None:
+            self.notify("Сначала получите данные (F5)", timeout=1.5)
+            return
+        if not card.purchase_price:
+            self.notify("Нужна закупочная цена", severity="warning", timeout=1.5)
+            return
+        panel.remove_class("hidden")
+        self._update_sensitivity()
+
+    def _update_live_status(self, extra: str = "") -> None:
+        status = self.query_one("#live_status", Static)
+        if self._live_timer is None and not self.pinned:
+            status.add_class("hidden")
+            return
+        parts = [
+            f"Авто-обновление: каждые {self.live_interval:g} с"
+            if self._live_timer is not None
+            else "Авто-обновление выключено (F8)"
+        ]
+        if self.pinned:
+            parts.append(f"закреплено: {', '.join(sorted(self.pinned))}")
+        if self.live_card is not None and self._live_timer is not None:
+            parts.append(f"обновлено {self._live_refreshed:%H:%M:%S}")
+            if self._live_changes:
+                parts.append(self._live_changes)
+        if extra:
+            parts.append(extra)
+        status.update(" • ".join(parts))
+        status.remove_class("hidden")
+
+    def action_toggle_live(self) -> None:
+        if self._live_timer is not None:
+            self._live_timer.stop()
+            self._live_timer = None
+            self.notify("Авто-обновление выключено", timeout=1.5)
+        else:
+            self._live_timer = self.set_interval(self.live_interval, self._live_tick)
+            self.notify(f"Авто-обновление каждые {self.live_interval:g} с", timeout=1.5)
+        self._update_live_status()
+
+    def action_toggle_pin(self) -> None:
+        sku = (
+            self.live_card.offer_id
+            if self.live_card is not None
+            else self.query_one("#sku", Input).value.strip()
+        )
+        if not sku:
+            return
+        if sku in self.pinned:
+            self.pinned.discard(sku)
+            if self.live_card is None or self.live_card.offer_id != sku:
+                self.live_watch.forget(sku)
+            self.notify(f"{sku} откреплён", timeout=1.5)
+        else:
+            self.pinned.add(sku)
+            self.notify(f"{sku} закреплён для авто-обновления", timeout=1.5)
+        self._update_live_status()
+
+    def _live_tick(self) -> None:
+        # A slow poll is not stacked with the next one; the tick is skipped.
+        if self._live_polling:
+            return
+        skus = set(self.pinned)
+        if self.live_card is not None:
+            skus.add(self.live_card.offer_id)
+        if skus:
+            self._live_polling = True
+            self.run_worker(self._live_poll(skus), group="live")
+
+    async def _live_poll(self, skus: set[str]) -> None:
+        try:
+            client = await self._client()
+            if client is None:
+                return
+            changed = self.live_watch.changed(await poll_prices(skus, client=client))
+        except (FetchError, LookupServerError, OSError, ValueError) as e:
+            if isinstance(e, OSError):
+                self._lookup_probe = None
+            self._update_live_status(f"ошибка обновления: {type(e).__name__}: {e}")
+            return
+        finally:
+            self._live_polling = False
+
+        self._live_refreshed = datetime.now()
+        # Pinned SKUs are reported even when one of them is the shown card.
+        pinned_changed = sorted(sku for sku in changed if sku in self.pinned)
+        card = self.live_card
+        cells = 0
+        if card is not None and card.offer_id in changed:
+            card.item = changed[card.offer_id]
+            sections = product_data(
+                card.item, card.info, user_purchase_price=card.purchase_price
+            )["sections"]
+            sections_view = self.query_one(ProductSections)
+            updated = sections_view.update_sections(sections)
+            if updated is None:
+                sections_view.show_sections(sections)
+                updated = sum(len(section["rows"]) for section in sections)
+            cells = updated
+            self._update_sensitivity()
+        if cells:
+            self._live_changes = (
+                f"изменено ячеек: {cells} в {self._live_refreshed:%H:%M:%S}"
+            )
+        self._update_live_status()
+        if pinned_changed:
+            self.notify(
+                f"Обновились закреплённые артикулы: {', '.join(pinned_changed)}",
+                timeout=3.0,
+            )
+
+    def action_profile_next(self) -> None:
+        self._profile_next = True
+        self.notify("Следующий запрос (F5) будет профилирован", timeout=2.0)
+
     async def action_query(self) -> None:
+        if not (self._profile_next or profiling_requested()):
+            await self._query()
+            return
+
+        self._profile_next = False
+        profiler = Profiler("lookup")
+        profiler.start()
+        try:
+            await self._query()
+        finally:
+            # Sections are painted after this handler returns, so the session
+            # ends on the next refresh to include mounting and rendering.
+            self.call_after_refresh(self._finish_profile, profiler, time.perf_counter())
+
+    def _finish_profile(self, profiler: Profiler, mount_started: float) -> None:
+        profiler.add_stage("mount", time.perf_counter() - mount_started)
+        path = profiler.stop()
+        self.notify(f"Профиль сохранён: {path}", timeout=4.0)
+
+    async def _query(self) -> None:
         sku_inp = self.query_one("#sku", Input)
         price_inp = self.query_one("#price", Input)
         sections_view = self.query_one(ProductSections)
@@ -187,6 +697,8 @@ class AppTUI(App):
             sku_inp.focus()
             return
 
+        # Prices saved by another TUI or by ``import-prices`` meanwhile.
+        self.purchase_prices.refresh()
         user_purchase_price: Decimal | None = None
         if raw_price:
             try:
@@ -199,22 +711,32 @@ class AppTUI(App):
                 sku_inp.focus()
                 return
 
-        # Берём секреты только из keychain/config
-        creds = load_credentials()
-        if not (creds.api_key and creds.client_id):
-            msg.show_error(
-                "Не заданы Client ID или API Key. Откройте онбординг и сохраните учётные данные."
-            )
-            sections_view.add_class("hidden")
-            return
-
         try:
-            async with APIClient(
-                client_id=creds.client_id,
-                api_key=creds.api_key,  # keyring already returns str
-            ) as client:
-                result: dict[str, Any] = await fetch_product_data(
-                    sku, client=client, user_purchase_price=user_purchase_price
+            # Карточка, загруженная заранее при вводе артикула: пересчитать
+            # только прибыль для введённой цены
+            prefetched = self.prefetch.take(sku)
+            if prefetched is not None:
+                result: dict[str, Any] = product_data(
+                    prefetched.item,
+                    prefetched.info,
+                    user_purchase_price=user_purchase_price,
+                    purchase_prices=self.purchase_prices,
+                    base_sections=prefetched.sections,
+                )
+            else:
+                # Через общий сервер, если он запущен; иначе секреты из keychain/config
+                client = await self._client()
+                if client is None:
+                    msg.show_error(
+                        "Не заданы Client ID или API Key. Откройте онбординг и сохраните учётные данные."
+                    )
+                    sections_view.add_class("hidden")
+                    return
+                result = await fetch_product_data(
+                    sku,
+                    client=client,
+                    user_purchase_price=user_purchase_price,
+                    purchase_prices=self.purchase_prices,
                 )
 
             if "error" in result:
@@ -224,8 +746,18 @@ class AppTUI(App):
                 return
 
             msg.hide()
+            if user_purchase_price is not None:
+                self.purchase_prices.set(result["raw"].offer_id, user_purchase_price)
+            info = result["info"]
+            self._index_offer(result["raw"].offer_id, info.name if info else None)
             sections_view.remove_class("hidden")
             sections_view.show_sections(result["sections"])
+            self._set_live_card(LiveCard(result["raw"], info, result["purchase_price"]))
+            if user_purchase_price is None and result["purchase_price"] is not None:
+                self.notify(
+                    f"Закупочная цена из реестра: {result['purchase_price']}",
+                    timeout=2.0,
+                )
             self.notify("Готово: данные обновлены", timeout=1.2)
 
         except ValidationError as e:
@@ -234,6 +766,9 @@ class AppTUI(App):
             sku_inp.focus()
             return
         except Exception as e:
+            if isinstance(e, OSError):
+                # The lookup server may be gone; probe it again next time.
+                self._lookup_probe = None
             msg.show_error(f"Ошибка: {type(e).__name__}: {e}")
             sections_view.add_class("hidden")
             sku_inp.focus()
@@ -248,9 +783,223 @@ class AppTUI(App):
             select_all()
 
 
-def main() -> None:
+async def _export_from_api(path: Path) -> int:
+    creds = load_credentials()
+    if not (creds.api_key and creds.client_id):
+        raise SystemExit(
+            "Не заданы Client ID или API Key. Запустите TUI для настройки."
+        )
+    store = load_catalog()
+    with PurchasePriceRegistry() as purchase_prices:
+        async with APIClient(
+            client_id=creds.client_id, api_key=creds.api_key
+        ) as client:
+            count = await export_catalog(
+                path, client=client, purchase_prices=purchase_prices, store=store
+            )
+    save_catalog(store)
+    return count
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="price-check",
+        description="OZON product price checker and profit calculator TUI",
+    )
+    parser.add_argument(
+        "--live-interval",
+        type=float,
+        default=None,
+        help="Интервал авто-обновления карточки (F8), секунд; "
+        "по умолчанию OZON_LIVE_INTERVAL или 60",
+    )
+    commands = parser.add_subparsers(dest="command")
+
+    export = commands.add_parser(
+        "export", help="Выгрузить отчёт по прибыли каталога в CSV или XLSX"
+    )
+    export.add_argument("path", type=Path, help="Файл отчёта (.csv или .xlsx)")
+    export.add_argument(
+        "--local",
+        action="store_true",
+        help="Использовать сохранённый каталог без запросов к API",
+    )
+
+    fulfilment = commands.add_parser(
+        "fulfilment",
+        help="Сравнить FBS и FBO по сохранённому каталогу",
+    )
+    fulfilment.add_argument(
+        "--top", type=int, default=20, help="Сколько товаров показать (по выгоде)"
+    )
+    fulfilment.add_argument(
+        "--output", type=Path, help="Сохранить полный рейтинг в CSV или XLSX"
+    )
+
+    sensitivity = commands.add_parser(
+        "sensitivity",
+        help="Прибыль по сетке цен продажи и закупки для сохранённого каталога",
+    )
+    sensitivity.add_argument("path", type=Path, help="Файл отчёта (.csv или .xlsx)")
+    sensitivity.add_argument(
+        "--steps", type=int, default=10, help="Шагов по каждой цене (по умолчанию 10)"
+    )
+    sensitivity.add_argument(
+        "--span",
+        type=Decimal,
+        default=Decimal(20),
+        help="Разброс цен вокруг текущих, %% (по умолчанию 20)",
+    )
+    sensitivity.add_argument(
+        "--scheme", choices=("fbs", "fbo"), default="fbs", help="Схема работы"
+    )
+
+    import_prices = commands.add_parser(
+        "import-prices", help="Загрузить закупочные цены из CSV (артикул;цена)"
+    )
+    import_prices.add_argument("path", type=Path, help="CSV-файл с ценами")
+
+    serve = commands.add_parser(
+        "serve", help="Общий сервер запросов для нескольких копий TUI"
+    )
+    serve.add_argument(
+        "--socket",
+        type=Path,
+        default=None,
+        help="Путь к Unix-сокету (по умолчанию — в runtime-каталоге пользователя)",
+    )
+    serve.add_argument(
+        "--ttl", type=float, default=30.0, help="Время жизни кэша, секунд"
+    )
+    return parser
+
+
+def _serve(socket_path: Path | None, ttl: float) -> None:
+    creds = load_credentials()
+    if not (creds.api_key and creds.client_id):
+        raise SystemExit(
+            "Не заданы Client ID или API Key. Запустите TUI для настройки."
+        )
+    path = socket_path or default_socket_path()
+    print(f"Сервер запросов слушает {path} (Ctrl+C — остановить)")
+    print(f"Для TUI в других терминалах: OZON_LOOKUP_SOCKET={path}")
+    try:
+        asyncio.run(run_server(path, creds.client_id, creds.api_key, ttl))
+    except KeyboardInterrupt:
+        pass
+
+
+def _import_prices(path: Path) -> None:
+    with PurchasePriceRegistry() as registry:
+        result = registry.import_csv(path)
+        total = len(registry)
+    for line_no, message in result.errors[:20]:
+        print(f"строка {line_no}: {message}")
+    if len(result.errors) > 20:
+        print(f"… и ещё {len(result.errors) - 20} ошибок")
+    print(
+        f"Обновлено цен: {result.updated}, без изменений: {result.unchanged}, "
+        f"ошибок: {len(result.errors)}; всего в реестре: {total}"
+    )
+
+
+def _range_text(bounds: tuple[float, float], suffix: str = "") -> str:
+    worst, best = bounds
+    return "—" if math.isnan(worst) else f"{worst:.0f}…{best:.0f}{suffix}"
+
+
+def _print_fulfilment(top: int, output: Path | None) -> None:
+    with stage("load"), PurchasePriceRegistry() as purchase_prices:
+        store = load_catalog()
+    with stage("analysis"):
+        analysis = analyze_fulfilment(store, purchase_prices)
+    ranking = analysis.ranking()
+
+    print(
+        f"{'Артикул':<24} {'FBS':>10} {'FBO':>10} {'Выгода FBO':>12} {'Диапазон':>17} "
+        f"{'Прибыль FBS':>15} {'Рент. FBS':>11} {'Прибыль FBO':>15} {'Рент. FBO':>11}"
+        "  Схема"
+    )
+    for row in ranking[:top]:
+        low, high = analysis.gain_range(row)
+        print(
+            f"{analysis.store.offer_ids[row]:<24} "
+            f"{from_fixed(analysis.fbs_max[row]):>10.2f} "
+            f"{from_fixed(analysis.fbo_max[row]):>10.2f} "
+            f"{from_fixed(analysis.gain(row)):>12.2f} "
+            f"{f'{from_fixed(low):.0f}…{from_fixed(high):.0f}':>17} "
+            f"{_range_text(analysis.profit_range(row, 'fbs')):>15} "
+            f"{_range_text(analysis.margin_range(row, 'fbs'), '%'):>11} "
+            f"{_range_text(analysis.profit_range(row, 'fbo')):>15} "
+            f"{_range_text(analysis.margin_range(row, 'fbo'), '%'):>11}  "
+            f"{analysis.recommended(row)}"
+        )
+
+    better = sum(1 for row in ranking if analysis.gain(row) > 0)
+    print(f"FBO выгоднее для {better} из {len(analysis)} товаров")
+
+    if output is not None:
+        with stage("output"), open_report_writer(output) as writer:
+            writer.write_row(fulfilment_header())
+            for row in ranking:
+                writer.write_row(analysis.row_values(row))
+        print(f"Рейтинг сохранён → {output}")
+
+
+def _write_sensitivity(path: Path, steps: int, span: Decimal, scheme: str) -> None:
+    spec = GridSpec(price_steps=steps, purchase_steps=steps, span=span / 100)
+    with stage("load"), PurchasePriceRegistry() as purchase_prices:
+        store = load_catalog()
+    started = time.perf_counter()
+    with stage("grid"):
+        grid = grid_from_store(store, purchase_prices, spec, scheme)
+    elapsed = time.perf_counter() - started
+    with stage("output"):
+        count = write_sensitivity(grid, path)
+    print(
+        f"Сетка {steps}×{steps} для {count} товаров рассчитана за {elapsed:.3f} с "
+        f"→ {path}"
+    )
+    if count < len(store):
+        print(f"Без закупочной цены пропущено: {len(store) - count}")
+
+
+def main(argv: list[str] | None = None) -> None:
     """Entry point for the CLI application."""
-    AppTUI().run()
+    args = build_parser().parse_args(argv)
+
+    if args.command == "export":
+        with maybe_profile("export"):
+            if args.local:
+                with PurchasePriceRegistry() as purchase_prices:
+                    count = export_store(load_catalog(), args.path, purchase_prices)
+            else:
+                count = asyncio.run(_export_from_api(args.path))
+        print(f"Выгружено товаров: {count} → {args.path}")
+        return
+
+    if args.command == "fulfilment":
+        with maybe_profile("fulfilment"):
+            _print_fulfilment(args.top, args.output)
+        return
+
+    if args.command == "sensitivity":
+        if args.steps < 1 or not 0 <= args.span < 100:
+            raise SystemExit("--steps должен быть ≥ 1, --span — от 0 до 100")
+        with maybe_profile("sensitivity"):
+            _write_sensitivity(args.path, args.steps, args.span, args.scheme)
+        return
+
+    if args.command == "import-prices":
+        with maybe_profile("import-prices"):
+            _import_prices(args.path)
+        return
+
+    if args.command == "serve":
+        _serve(args.socket, args.ttl)
+        return
+
+    AppTUI(live_interval=args.live_interval).run()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,250 @@
+"""Opt-in profiling of one lookup cycle or one batch run.
+
+A ``Profiler`` session runs in one of two modes (``OZON_PROFILE_MODE``):
+
+* ``sample`` (default) — a thread samples the profiled thread's stack every
+  few milliseconds and writes ``<name>.folded``, one
+  ``frame;frame;frame count`` line per stack, ready for ``flamegraph.pl``
+  or speedscope. Overhead is low, so timings stay realistic.
+* ``cprofile`` — deterministic cProfile data in ``<name>.pstats``
+  (``python -m pstats``, snakeviz). Exact call counts, but slower.
+
+Both write ``<name>.txt`` with per-stage timings and the top functions by
+cumulative time.
+
+Stages are marked in the code with ``with stage("network"):``. Outside a
+session this is a no-op, so the markers stay in place permanently. Stage
+times are summed over all occurrences, so concurrent stages (e.g. parallel
+requests) can add up to more than the wall time.
+
+Set ``OZON_PROFILE=1`` (or a directory path) to profile every F5 cycle in the
+TUI and every CLI batch run; F9 in the TUI profiles the next F5 only.
+"""
+
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from pathlib import Path
+from types import FrameType, TracebackType
+from typing import Optional, Self
+
+from platformdirs import user_cache_dir
+
+PROFILE_ENV = "OZON_PROFILE"
+PROFILE_MODE_ENV = "OZON_PROFILE_MODE"
+SAMPLE = "sample"
+CPROFILE = "cprofile"
+SAMPLE_INTERVAL = 0.005
+TOP_N = 25
+
+_active: ContextVar[Optional["Profiler"]] = ContextVar("active_profiler", default=None)
+
+
+def profiling_requested() -> bool:
+    return os.environ.get(PROFILE_ENV, "").strip() not in ("", "0")
+
+
+def profile_dir() -> Path:
+    """Output directory: ``OZON_PROFILE`` if it is a path, else the cache dir."""
+    value = os.environ.get(PROFILE_ENV, "").strip()
+    if value and value not in ("1", "0"):
+        return Path(value)
+    return Path(user_cache_dir("price-check", "kashikuroni")) / "profiles"
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Attribute the enclosed wall time to ``name`` in the active session."""
+    profiler = _active.get()
+    if profiler is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        profiler.add_stage(name, time.perf_counter() - started)
+
+
+def _frame_name(frame: FrameType) -> str:
+    code = frame.f_code
+    return (
+        f"{code.co_qualname} "
+        f"({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+    )
+
+
+class _StackSampler(threading.Thread):
+    """Samples the stack of one thread at a fixed interval."""
+
+    def __init__(self, thread_id: int, interval: float) -> None:
+        super().__init__(name="profile-sampler", daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter[str] = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            names: list[str] = []
+            while frame is not None:
+                names.append(_frame_name(frame))
+                frame = frame.f_back
+            if names:
+                self.stacks[";".join(reversed(names))] += 1
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.join()
+
+
+class Profiler:
+    """One profiling session; use as a context manager or ``start``/``stop``."""
+
+    def __init__(
+        self,
+        label: str,
+        output_dir: Path | None = None,
+        mode: str | None = None,
+        sample_interval: float = SAMPLE_INTERVAL,
+    ) -> None:
+        self.label = label
+        self.output_dir = Path(output_dir) if output_dir else profile_dir()
+        self.mode = (mode or os.environ.get(PROFILE_MODE_ENV) or SAMPLE).lower()
+        if self.mode not in (SAMPLE, CPROFILE):
+            raise ValueError(f"Unknown profiling mode: {self.mode!r}")
+        self.sample_interval = sample_interval
+        self.stages: dict[str, float] = defaultdict(float)
+        self.stage_counts: Counter[str] = Counter()
+        self.wall_time = 0.0
+        self.summary_path: Path | None = None
+        self._profile: cProfile.Profile | None = None
+        self._sampler: _StackSampler | None = None
+        self._token = None
+        self._started = 0.0
+
+    def __enter__(self) -> Self:
+        self.start()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        self.stop()
+
+    def add_stage(self, name: str, seconds: float) -> None:
+        self.stages[name] += seconds
+        self.stage_counts[name] += 1
+
+    def start(self) -> None:
+        self._token = _active.set(self)
+        # Only one of the two: cProfile would also trace the sampler thread.
+        if self.mode == CPROFILE:
+            self._profile = cProfile.Profile()
+        else:
+            self._sampler = _StackSampler(threading.get_ident(), self.sample_interval)
+            self._sampler.start()
+        self._started = time.perf_counter()
+        if self._profile is not None:
+            self._profile.enable()
+
+    def stop(self) -> Path:
+        """Stop the session, write all outputs and return the summary path."""
+        if self._profile is not None:
+            self._profile.disable()
+        self.wall_time = time.perf_counter() - self._started
+        if self._sampler is not None:
+            self._sampler.stop()
+        if self._token is not None:
+            try:
+                _active.reset(self._token)
+            except ValueError:
+                # Stopped from a different context than it was started in.
+                _active.set(None)
+            self._token = None
+        return self._write()
+
+    def _write(self) -> Path:
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        base = self.output_dir / f"{self.label}-{stamp}"
+
+        if self._profile is not None:
+            self._profile.dump_stats(base.with_suffix(".pstats"))
+        if self._sampler is not None:
+            with base.with_suffix(".folded").open("w", encoding="utf-8") as fh:
+                for stack, count in self._sampler.stacks.most_common():
+                    fh.write(f"{stack} {count}\n")
+
+        self.summary_path = base.with_suffix(".txt")
+        self.summary_path.write_text(self.summary(), encoding="utf-8")
+        return self.summary_path
+
+    def summary(self, top: int = TOP_N) -> str:
+        lines = [f"{self.label}: {self.wall_time * 1000:.1f} ms wall", "", "Stages:"]
+        for name, seconds in sorted(
+            self.stages.items(), key=lambda kv: kv[1], reverse=True
+        ):
+            share = seconds / self.wall_time * 100 if self.wall_time else 0.0
+            lines.append(
+                f"  {name:<14} {seconds * 1000:>9.1f} ms {share:>6.1f}%"
+                f"  ×{self.stage_counts[name]}"
+            )
+        if not self.stages:
+            lines.append("  (none recorded)")
+
+        lines += ["", f"Top {top} by cumulative time:"]
+        if self._profile is not None:
+            out = io.StringIO()
+            stats = pstats.Stats(self._profile, stream=out)
+            stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(top)
+            lines.append(out.getvalue().strip())
+        elif self._sampler is not None:
+            lines += self._sampled_top(self._sampler.stacks, top)
+        return "\n".join(lines) + "\n"
+
+    def _sampled_top(self, stacks: Counter[str], top: int) -> list[str]:
+        total = sum(stacks.values())
+        if not total:
+            return ["  (no samples)"]
+        inclusive: Counter[str] = Counter()
+        own: Counter[str] = Counter()
+        for stack, count in stacks.items():
+            frames = stack.split(";")
+            own[frames[-1]] += count
+            for name in set(frames):
+                inclusive[name] += count
+        lines = [f"  {'cum%':>6} {'self%':>6}  function ({total} samples)"]
+        for name, count in inclusive.most_common(top):
+            lines.append(
+                f"  {count / total * 100:>6.1f} {own[name] / total * 100:>6.1f}  {name}"
+            )
+        return lines
+
+
+@contextmanager
+def maybe_profile(label: str) -> Iterator[Profiler | None]:
+    """Profile the enclosed block only when ``OZON_PROFILE`` is set."""
+    if not profiling_requested():
+        yield None
+        return
+    profiler = Profiler(label)
+    profiler.start()
+    try:
+        yield profiler
+    finally:
+        path = profiler.stop()
+        print(f"Профиль сохранён: {path}", file=sys.stderr)
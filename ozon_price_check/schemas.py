@@ -131,6 +131,41 @@ class ProductsResponse(BaseModel):
     total: int
 
 
+class ProductStock(BaseModel):
+    present: int = 0
+    reserved: int = 0
+    source: str = ""
+
+
+class ProductStocks(BaseModel):
+    has_stock: bool = False
+    stocks: list[ProductStock] = []
+
+
+class ProductInfo(BaseModel):
+    product_id: int = Field(..., alias="id")
+    offer_id: str
+    name: str = ""
+    barcodes: list[str] = []
+    stocks: ProductStocks = ProductStocks()
+
+    model_config = ConfigDict(extra="ignore", populate_by_name=True)
+
+    @computed_field
+    @property
+    def stock_present(self) -> int:
+        return sum(stock.present for stock in self.stocks.stocks)
+
+    @computed_field
+    @property
+    def stock_reserved(self) -> int:
+        return sum(stock.reserved for stock in self.stocks.stocks)
+
+
+class ProductInfoResponse(BaseModel):
+    items: list[ProductInfo]
+
+
 class AutoActionStatus(str, Enum):
     UNKNOWN = "UNKNOWN"
     ENABLED = "ENABLED"
@@ -0,0 +1,156 @@
+"""In-memory prefix and fuzzy index over offer_ids and product names."""
+
+import heapq
+from bisect import bisect_left, insort
+from collections import defaultdict
+from collections.abc import Iterable
+from typing import NamedTuple
+
+from ozon_price_check.utils import normalize
+
+# Trigrams present in more entries than this are too common to narrow a fuzzy
+# search down (think "sku" in "SKU-1", "SKU-2", ...), so they are skipped.
+MAX_POSTING_SCAN = 2_000
+
+
+class Suggestion(NamedTuple):
+    offer_id: str
+    name: str | None
+
+
+def _normalize(text: str) -> str:
+    return str(normalize(text))
+
+
+def _trigrams(key: str) -> set[str]:
+    padded = f"  {key} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+class SkuSearchIndex:
+    """Suggest offer_ids for a partially typed SKU or product name.
+
+    Keys are normalized with ``utils.normalize``. Prefix lookups use a sorted
+    key list and ``bisect``; when they return too few results, a trigram
+    index adds fuzzy matches. ``add`` keeps both structures up to date
+    incrementally.
+    """
+
+    def __init__(self) -> None:
+        # Entry id -> (normalized key, offer_id); None marks a removed entry.
+        self._entries: list[tuple[str, str] | None] = []
+        self._sorted: list[tuple[str, int]] = []
+        self._postings: defaultdict[str, list[int]] = defaultdict(list)
+        self._names: dict[str, str | None] = {}
+        self._entries_by_offer: dict[str, list[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __contains__(self, offer_id: object) -> bool:
+        return offer_id in self._names
+
+    def name_of(self, offer_id: str) -> str | None:
+        return self._names.get(offer_id)
+
+    def extend(self, offers: Iterable[tuple[str, str | None]]) -> None:
+        """Index many offers at once, sorting the key list a single time."""
+        for offer_id, name in offers:
+            self.add(offer_id, name, _keep_sorted=False)
+        self._sorted.sort()
+
+    def add(
+        self, offer_id: str, name: str | None = None, *, _keep_sorted: bool = True
+    ) -> None:
+        """Index an offer, replacing its name if it changed."""
+        if offer_id in self._names:
+            if name is None or self._names[offer_id] == name:
+                return
+            for entry_id in self._entries_by_offer.pop(offer_id):
+                self._remove_entry(entry_id)
+
+        self._names[offer_id] = name
+        keys = {_normalize(offer_id)}
+        if name:
+            normalized_name = _normalize(name)
+            keys.add(normalized_name)
+            keys.update(word for word in normalized_name.split() if len(word) > 2)
+        self._entries_by_offer[offer_id] = [
+            self._add_entry(key, offer_id, _keep_sorted) for key in keys if key
+        ]
+
+    def _add_entry(self, key: str, offer_id: str, keep_sorted: bool) -> int:
+        entry_id = len(self._entries)
+        self._entries.append((key, offer_id))
+        if keep_sorted:
+            insort(self._sorted, (key, entry_id))
+        else:
+            self._sorted.append((key, entry_id))
+        for gram in _trigrams(key):
+            self._postings[gram].append(entry_id)
+        return entry_id
+
+    def _remove_entry(self, entry_id: int) -> None:
+        entry = self._entries[entry_id]
+        if entry is None:
+            return
+        key, _ = entry
+        position = bisect_left(self._sorted, (key, entry_id))
+        if position < len(self._sorted) and self._sorted[position] == (key, entry_id):
+            del self._sorted[position]
+        elif (key, entry_id) in self._sorted:
+            # Inside ``extend`` the key list is not sorted yet.
+            self._sorted.remove((key, entry_id))
+        # Postings keep the stale id; lookups skip removed entries.
+        self._entries[entry_id] = None
+
+    def suggest(self, query: str, limit: int = 8) -> list[Suggestion]:
+        """Return up to ``limit`` offers, prefix matches first."""
+        key = _normalize(query)
+        if not key:
+            return []
+
+        found: dict[str, None] = {}
+        position = bisect_left(self._sorted, (key, -1))
+        while position < len(self._sorted) and len(found) < limit:
+            candidate, entry_id = self._sorted[position]
+            if not candidate.startswith(key):
+                break
+            found.setdefault(self._entries[entry_id][1])  # type: ignore[index]
+            position += 1
+
+        if len(found) < limit and len(key) >= 3:
+            for offer_id in self._fuzzy(key, limit * 4):
+                if len(found) >= limit:
+                    break
+                found.setdefault(offer_id)
+
+        return [Suggestion(offer_id, self._names[offer_id]) for offer_id in found]
+
+    def _fuzzy(self, key: str, limit: int) -> list[str]:
+        postings = sorted(
+            (self._postings[gram] for gram in _trigrams(key) if gram in self._postings),
+            key=len,
+        )
+        scores: defaultdict[int, int] = defaultdict(int)
+        scanned = 0
+        for posting in postings:
+            if len(posting) > MAX_POSTING_SCAN and scores:
+                break
+            scanned += 1
+            for entry_id in posting[:MAX_POSTING_SCAN]:
+                scores[entry_id] += 1
+
+        # Require about half of the scanned query trigrams to match.
+        threshold = max(1, scanned // 2)
+        best = heapq.nlargest(
+            limit,
+            (item for item in scores.items() if item[1] >= threshold),
+            key=lambda item: item[1],
+        )
+        result = []
+        for entry_id, _ in best:
+            entry = self._entries[entry_id]
+            if entry is not None:
+                result.append(entry[1])
+        return result
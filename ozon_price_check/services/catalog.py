@@ -0,0 +1,258 @@
+"""Catalog sync, local persistence and precomputed catalog metrics."""
+
+import math
+import operator
+import re
+from array import array
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass, field
+from decimal import Decimal, InvalidOperation
+from pathlib import Path
+
+from platformdirs import user_cache_dir
+
+from ..catalog import FIXED_SCALE, CatalogStore, margin_hundredths, to_fixed
+from ..core_client import APIClient
+from ..lookup_server import LookupClient
+from .enrichment import iter_enriched_prices
+
+CATALOG_FORMAT_VERSION = 3
+_CATALOG_MAGIC = b"OZCATLG"
+
+ProgressCallback = Callable[[int], None]
+
+
+def _catalog_path() -> Path:
+    cache_dir = Path(user_cache_dir("price-check", "kashikuroni"))
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    return cache_dir / "catalog.bin"
+
+
+def load_catalog(path: Path | None = None) -> CatalogStore:
+    """Load the locally stored catalog, or return an empty one."""
+    path = path or _catalog_path()
+    if not path.exists():
+        return CatalogStore()
+    try:
+        with path.open("rb") as fh:
+            magic, version = fh.read(len(_CATALOG_MAGIC)), fh.read(1)
+            if magic != _CATALOG_MAGIC or version != bytes([CATALOG_FORMAT_VERSION]):
+                return CatalogStore()
+            return CatalogStore.load(fh)
+    except (OSError, KeyError, TypeError, ValueError):
+        return CatalogStore()
+
+
+def save_catalog(store: CatalogStore, path: Path | None = None) -> None:
+    """Persist the catalog atomically next to the other app data."""
+    path = path or _catalog_path()
+    tmp_path = path.with_suffix(".tmp")
+    with tmp_path.open("wb") as fh:
+        fh.write(_CATALOG_MAGIC + bytes([CATALOG_FORMAT_VERSION]))
+        store.dump(fh)
+    tmp_path.replace(path)
+
+
+async def sync_catalog(
+    store: CatalogStore,
+    *,
+    client: APIClient | LookupClient,
+    on_progress: ProgressCallback | None = None,
+) -> int:
+    """Fetch prices and product info for the whole catalog into ``store``.
+
+    Through a ``LookupClient`` the listing runs on the shared lookup server,
+    within the same per-endpoint limits as every TUI's lookups. Pages are
+    requested at bulk priority either way.
+
+    Returns the number of items received.
+    """
+    if isinstance(client, LookupClient):
+        pages = client.iter_enriched_prices()
+    else:
+        pages = iter_enriched_prices(client=client)
+    received = 0
+    async for page in pages:
+        for item, info in page:
+            store.add(item, info)
+        received += len(page)
+        if on_progress:
+            on_progress(received)
+    return received
+
+
+# Column key -> header shown in the catalog table.
+CATALOG_COLUMNS: dict[str, str] = {
+    "offer_id": "Артикул",
+    "price": "Цена",
+    "min_price": "Мин. цена",
+    "fbs": "FBS комиссия",
+    "fbo": "FBO комиссия",
+    "profit": "Прибыль",
+    "margin": "Рентабельность",
+    "color": "Индекс",
+}
+
+
+@dataclass
+class CatalogMetrics:
+    """Per-row display and sort values for the catalog table.
+
+    Money columns are fixed-point integers (see ``catalog.to_fixed``); profit
+    and margin are floats with NaN where the purchase price is unknown.
+    Sort indexes are computed once per column and reused.
+    """
+
+    store: CatalogStore
+    price: array
+    min_price: array
+    fbs: array
+    fbo: array
+    profit: array
+    margin: array
+    _sort_indexes: dict[str, list[int]] = field(default_factory=dict, repr=False)
+
+    def column(self, key: str):
+        if key == "offer_id":
+            return self.store.offer_ids
+        if key == "color":
+            return self.store.color_indexes
+        return getattr(self, key)
+
+    def sort_index(self, key: str) -> list[int]:
+        """Return row numbers ordered by ``key`` ascending (NaN last)."""
+        index = self._sort_indexes.get(key)
+        if index is None:
+            values = self.column(key)
+            if key in _FLOAT_KEYS:
+                index = sorted(
+                    range(len(values)),
+                    key=lambda row: (math.isnan(values[row]), values[row]),
+                )
+            else:
+                index = sorted(range(len(values)), key=values.__getitem__)
+            self._sort_indexes[key] = index
+        return index
+
+
+def compute_metrics(
+    store: CatalogStore,
+    purchase_prices: Mapping[str, Decimal] | None = None,
+) -> CatalogMetrics:
+    """Precompute catalog table columns, mirroring ``create_profit_section``."""
+    purchase_prices = purchase_prices or {}
+    price = store.decimals["marketing_seller_price"]
+    fbs = store.total_commissions("fbs")
+    fbo = store.total_commissions("fbo")
+    profit = array("d", bytes(8 * len(store)))
+    margin = array("d", bytes(8 * len(store)))
+    for row, offer_id in enumerate(store.offer_ids):
+        purchase = purchase_prices.get(offer_id)
+        if purchase is None:
+            profit[row] = margin[row] = math.nan
+            continue
+        purchase_fixed = to_fixed(purchase)
+        profit_fixed = price[row] - fbs[row] - purchase_fixed
+        profit[row] = profit_fixed / FIXED_SCALE
+        margin[row] = margin_hundredths(profit_fixed, purchase_fixed) / 100
+    return CatalogMetrics(
+        store=store,
+        price=price,
+        min_price=store.decimals["min_price"],
+        fbs=fbs,
+        fbo=fbo,
+        profit=profit,
+        margin=margin,
+    )
+
+
+_OPERATORS: dict[str, Callable[[object, object], bool]] = {
+    "<=": operator.le,
+    ">=": operator.ge,
+    "!=": operator.ne,
+    "==": operator.eq,
+    "<": operator.lt,
+    ">": operator.gt,
+    "=": operator.eq,
+}
+_MONEY_KEYS = {"price", "min_price", "fbs", "fbo"}
+_FLOAT_KEYS = {"profit", "margin"}
+_TEXT_KEYS = {"offer_id", "color"}
+
+RowFilter = Callable[[int], bool]
+
+
+_CONDITION_RE = re.compile(r"\s*(\w+)\s*(<=|>=|!=|==|<|>|=)\s*([^\s,]+)\s*,?")
+
+
+def _parse_condition(
+    metrics: CatalogMetrics, key: str, symbol: str, raw_value: str
+) -> RowFilter:
+    op = _OPERATORS[symbol]
+    key = key.lower()
+    raw_value = raw_value.rstrip("%")
+    values = metrics.column(key) if key in CATALOG_COLUMNS else None
+    if values is None:
+        raise ValueError(f"Неизвестное поле: {key!r}")
+
+    if key in _TEXT_KEYS:
+        if op not in (operator.eq, operator.ne):
+            raise ValueError(f"Для поля {key!r} доступны только = и !=")
+        expected = raw_value.upper() if key == "color" else raw_value
+        return lambda row: op(values[row], expected)
+
+    try:
+        number = Decimal(raw_value.replace(",", "."))
+    except InvalidOperation:
+        raise ValueError(f"Ожидалось число: {raw_value!r}")
+    if not number.is_finite():
+        raise ValueError(f"Ожидалось число: {raw_value!r}")
+
+    if key in _MONEY_KEYS:
+        threshold = to_fixed(number)
+        return lambda row: op(values[row], threshold)
+    threshold_float = float(number)
+    return lambda row: not math.isnan(values[row]) and op(values[row], threshold_float)
+
+
+def parse_filter(metrics: CatalogMetrics, expression: str) -> RowFilter | None:
+    """Parse a filter such as ``margin<10 color=RED`` into a row predicate.
+
+    Conditions are separated by whitespace or commas and combined with AND.
+    Returns None for an empty expression.
+    """
+    conditions = []
+    position = 0
+    expression = expression.strip()
+    while position < len(expression):
+        match = _CONDITION_RE.match(expression, position)
+        if not match:
+            raise ValueError(f"Не понимаю условие: {expression[position:]!r}")
+        conditions.append(_parse_condition(metrics, *match.groups()))
+        position = match.end()
+
+    if not conditions:
+        return None
+    if len(conditions) == 1:
+        return conditions[0]
+    return lambda row: all(condition(row) for condition in conditions)
+
+
+def catalog_view_order(
+    metrics: CatalogMetrics,
+    sort_key: str = "offer_id",
+    descending: bool = False,
+    row_filter: RowFilter | None = None,
+) -> list[int]:
+    """Return visible row numbers in display order using cached sort indexes."""
+    index = metrics.sort_index(sort_key)
+    if descending:
+        if sort_key in _FLOAT_KEYS:
+            values = metrics.column(sort_key)
+            known = len(index) - sum(1 for value in values if math.isnan(value))
+            index = index[:known][::-1] + index[known:]
+        else:
+            index = index[::-1]
+    if row_filter is None:
+        return index
+    return [row for row in index if row_filter(row)]
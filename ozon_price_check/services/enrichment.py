@@ -0,0 +1,110 @@
+"""Join price data with product info from ``/v3/product/info/list``."""
+
+import asyncio
+import logging
+from collections import deque
+from collections.abc import AsyncIterator, Iterable
+
+from ..client import ProductsAPIClient
+from ..concurrency import Priority
+from ..core_client import APIClient, FetchError
+from ..schemas import Item, ProductInfo
+
+EnrichedItem = tuple[Item, ProductInfo | None]
+
+logger = logging.getLogger(__name__)
+
+
+class ProductInfoIndex:
+    """Hash index of product info by ``product_id`` for joining with prices."""
+
+    def __init__(self, infos: Iterable[ProductInfo] = ()) -> None:
+        self._by_product_id: dict[int, ProductInfo] = {}
+        self.update(infos)
+
+    def __len__(self) -> int:
+        return len(self._by_product_id)
+
+    def update(self, infos: Iterable[ProductInfo]) -> None:
+        for info in infos:
+            self._by_product_id[info.product_id] = info
+
+    def get(self, product_id: int) -> ProductInfo | None:
+        return self._by_product_id.get(product_id)
+
+    def join(self, items: Iterable[Item]) -> list[EnrichedItem]:
+        return [(item, self.get(item.product_id)) for item in items]
+
+
+async def fetch_enriched_item(
+    sku: str,
+    *,
+    client: APIClient,
+    interactive: bool = True,
+    priority: Priority | None = None,
+) -> EnrichedItem:
+    """Fetch prices and product info for one SKU concurrently.
+
+    Product info is optional for the card: if that request fails, the item
+    is returned without it. Batch callers pass ``interactive=False`` to skip
+    hedging and run at bulk priority; ``priority`` overrides the class.
+    """
+    product_client = ProductsAPIClient(client)
+    item, infos = await asyncio.gather(
+        product_client.get_product_info(
+            sku, interactive=interactive, priority=priority
+        ),
+        product_client.get_product_info_list(
+            offer_ids=[sku], interactive=interactive, priority=priority
+        ),
+        return_exceptions=True,
+    )
+    if isinstance(item, BaseException):
+        raise item
+    if isinstance(infos, BaseException):
+        return item, None
+    return item, ProductInfoIndex(infos).get(item.product_id)
+
+
+async def _info_index(task: "asyncio.Task[list[ProductInfo]]") -> ProductInfoIndex:
+    # Info is optional, as for a single card: a failed chunk leaves its page
+    # without names and stocks instead of aborting the whole listing.
+    try:
+        return ProductInfoIndex(await task)
+    except (FetchError, ValueError) as e:
+        logger.warning("Product info for a page of prices failed: %s", e)
+        return ProductInfoIndex()
+
+
+async def iter_enriched_prices(
+    *, client: APIClient
+) -> AsyncIterator[list[EnrichedItem]]:
+    """Stream the catalog as pages of (price item, product info) pairs.
+
+    Price pages are listed with one cursor per visibility partition when the
+    catalog splits evenly (see ``iter_product_prices_partitioned``), while
+    the info request for every received page runs in the background, so the
+    endpoints overlap instead of alternating. Pages are yielded in arrival
+    order as soon as their info arrives; a page whose info request failed is
+    yielded without info.
+    """
+    product_client = ProductsAPIClient(client)
+    pending: deque[tuple[list[Item], asyncio.Task[list[ProductInfo]]]] = deque()
+    try:
+        async for page in product_client.iter_product_prices_partitioned():
+            task = asyncio.create_task(
+                product_client.get_product_info_list(
+                    product_ids=[item.product_id for item in page]
+                )
+            )
+            pending.append((page, task))
+            while pending and pending[0][1].done():
+                items, done = pending.popleft()
+                yield (await _info_index(done)).join(items)
+
+        while pending:
+            items, task = pending.popleft()
+            yield (await _info_index(task)).join(items)
+    finally:
+        for _, task in pending:
+            task.cancel()
@@ -0,0 +1,322 @@
+"""Streaming export of catalog profit reports to CSV and XLSX.
+
+Rows are written as soon as they are produced, so memory use does not grow
+with the catalog size: the CSV writer writes straight to the file and the
+XLSX writer streams the worksheet XML into the zip archive.
+"""
+
+import csv
+import re
+import zipfile
+from abc import ABC, abstractmethod
+from collections.abc import Iterable, Mapping, Sequence
+from decimal import Decimal
+from itertools import zip_longest
+from pathlib import Path
+from types import TracebackType
+from typing import Any, Self
+from xml.sax.saxutils import escape
+
+from ..catalog import CatalogStore
+from ..core_client import APIClient
+from ..i18n.ru_labels import ru_label
+from ..schemas import Commissions, Item, Price, ProductInfo
+from .enrichment import iter_enriched_prices
+from .products import calculate_profit
+
+_COMPUTED_FIELDS: tuple[str, ...] = (
+    "fbs_commission_without_percent",
+    "fbs_ozon_percent",
+    "fbs_total_commission",
+    "fbo_commission_without_percent",
+    "fbo_ozon_percent",
+    "fbo_total_commission",
+)
+_PROFIT_FIELDS: tuple[str, ...] = (
+    "fbs_profit",
+    "fbs_profit_margin",
+    "fbo_profit",
+    "fbo_profit_margin",
+)
+
+REPORT_FIELDS: tuple[str, ...] = (
+    ("offer_id", "product_id", "name", "acquiring")
+    + tuple(Commissions.model_fields)
+    + tuple(Price.model_fields)
+    + _COMPUTED_FIELDS
+    + ("user_purchase_price",)
+    + _PROFIT_FIELDS
+)
+
+
+def report_header() -> list[str]:
+    return [ru_label(name) for name in REPORT_FIELDS]
+
+
+def report_row(
+    item: Item,
+    info: ProductInfo | None = None,
+    user_purchase_price: Decimal | None = None,
+) -> list[Any]:
+    """Build one report row; profit columns are empty without a purchase price."""
+    row: list[Any] = [
+        item.offer_id,
+        item.product_id,
+        info.name if info else None,
+        item.acquiring,
+    ]
+    row.extend(getattr(item.commissions, name) for name in Commissions.model_fields)
+    row.extend(getattr(item.price, name) for name in Price.model_fields)
+    row.extend(getattr(item, name) for name in _COMPUTED_FIELDS)
+    row.append(user_purchase_price)
+    if user_purchase_price is None:
+        row.extend([None] * len(_PROFIT_FIELDS))
+    else:
+        price = item.price.marketing_seller_price
+        row.extend(
+            calculate_profit(price, item.fbs_total_commission, user_purchase_price)
+        )
+        row.extend(
+            calculate_profit(price, item.fbo_total_commission, user_purchase_price)
+        )
+    return row
+
+
+class ReportWriter(ABC):
+    """Base class for streaming report writers; use as a context manager."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self.rows_written = 0
+
+    def __enter__(self) -> Self:
+        self.open()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    @abstractmethod
+    def open(self) -> None: ...
+
+    @abstractmethod
+    def write_row(
+        self, values: Sequence[Any], fills: Sequence[str | None] | None = None
+    ) -> None:
+        """Write one row; ``fills`` names a background per cell (``FILLS``).
+
+        Formats without styling ignore ``fills``.
+        """
+
+    @abstractmethod
+    def close(self) -> None: ...
+
+
+class CsvReportWriter(ReportWriter):
+    def open(self) -> None:
+        # utf-8-sig so that Excel detects the encoding of Cyrillic headers.
+        self._fh = self.path.open("w", encoding="utf-8-sig", newline="")
+        self._writer = csv.writer(self._fh)
+
+    def write_row(
+        self, values: Sequence[Any], fills: Sequence[str | None] | None = None
+    ) -> None:
+        self._writer.writerow(["" if value is None else value for value in values])
+        self.rows_written += 1
+
+    def close(self) -> None:
+        self._fh.close()
+
+
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" '
+    'ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" ContentType="application/'
+    'vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/'
+    'vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '<Override PartName="/xl/styles.xml" ContentType="application/'
+    'vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    "</Types>"
+)
+_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/'
+    'officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+    "</Relationships>"
+)
+_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="Report" sheetId="1" r:id="rId1"/></sheets>'
+    "</workbook>"
+)
+_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/'
+    'officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+    '<Relationship Id="rId2" Type="http://schemas.openxmlformats.org/'
+    'officeDocument/2006/relationships/styles" Target="styles.xml"/>'
+    "</Relationships>"
+)
+# Cell background colours (ARGB) usable in ``ReportWriter.write_row``.
+FILLS: dict[str, str] = {
+    "red": "FFF8696B",
+    "orange": "FFFBAA77",
+    "yellow": "FFFFEB84",
+    "lightgreen": "FFB1D580",
+    "green": "FF63BE7B",
+}
+# Style index 0 is the default; fill N of FILLS is style N + 1.
+_FILL_STYLES = {name: index for index, name in enumerate(FILLS, 1)}
+_STYLES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<fonts count="1"><font><sz val="11"/><name val="Calibri"/></font></fonts>'
+    f'<fills count="{len(FILLS) + 2}">'
+    '<fill><patternFill patternType="none"/></fill>'
+    '<fill><patternFill patternType="gray125"/></fill>'
+    + "".join(
+        f'<fill><patternFill patternType="solid"><fgColor rgb="{rgb}"/>'
+        "</patternFill></fill>"
+        for rgb in FILLS.values()
+    )
+    + "</fills>"
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border>'
+    "</borders>"
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/>'
+    "</cellStyleXfs>"
+    f'<cellXfs count="{len(FILLS) + 1}">'
+    '<xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    + "".join(
+        f'<xf numFmtId="0" fontId="0" fillId="{index + 1}" borderId="0" xfId="0" '
+        'applyFill="1"/>'
+        for index in _FILL_STYLES.values()
+    )
+    + "</cellXfs></styleSheet>"
+)
+_SHEET_START = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    "<sheetData>"
+)
+_SHEET_END = "</sheetData></worksheet>"
+_ILLEGAL_XML_CHARS = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+
+def _xlsx_cell(value: Any, fill: str | None = None) -> str:
+    style = f' s="{_FILL_STYLES[fill]}"' if fill else ""
+    if value is None:
+        return f"<c{style}/>"
+    if isinstance(value, bool):
+        return f'<c t="b"{style}><v>{int(value)}</v></c>'
+    if isinstance(value, (int, float, Decimal)):
+        return f"<c{style}><v>{value}</v></c>"
+    text = escape(_ILLEGAL_XML_CHARS.sub("", str(value)))
+    return f'<c t="inlineStr"{style}><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+class XlsxReportWriter(ReportWriter):
+    """Minimal single-sheet XLSX writer with inline strings."""
+
+    def open(self) -> None:
+        self._zip = zipfile.ZipFile(self.path, "w", zipfile.ZIP_DEFLATED)
+        self._sheet = self._zip.open("xl/worksheets/sheet1.xml", "w", force_zip64=True)
+        self._sheet.write(_SHEET_START.encode())
+
+    def write_row(
+        self, values: Sequence[Any], fills: Sequence[str | None] | None = None
+    ) -> None:
+        if fills:
+            cells = "".join(
+                _xlsx_cell(value, fill) for value, fill in zip_longest(values, fills)
+            )
+        else:
+            cells = "".join(_xlsx_cell(value) for value in values)
+        self._sheet.write(f"<row>{cells}</row>".encode())
+        self.rows_written += 1
+
+    def close(self) -> None:
+        self._sheet.write(_SHEET_END.encode())
+        self._sheet.close()
+        self._zip.writestr("[Content_Types].xml", _CONTENT_TYPES)
+        self._zip.writestr("_rels/.rels", _ROOT_RELS)
+        self._zip.writestr("xl/workbook.xml", _WORKBOOK)
+        self._zip.writestr("xl/_rels/workbook.xml.rels", _WORKBOOK_RELS)
+        self._zip.writestr("xl/styles.xml", _STYLES)
+        self._zip.close()
+
+
+def open_report_writer(path: Path) -> ReportWriter:
+    """Pick the writer by file extension (.csv or .xlsx)."""
+    suffix = Path(path).suffix.lower()
+    if suffix == ".csv":
+        return CsvReportWriter(path)
+    if suffix == ".xlsx":
+        return XlsxReportWriter(path)
+    raise ValueError(f"Unsupported report format: {suffix or path}")
+
+
+def write_report(
+    path: Path,
+    rows: Iterable[tuple[Item, ProductInfo | None]],
+    purchase_prices: Mapping[str, Decimal] | None = None,
+) -> int:
+    """Write a report for (item, info) pairs; returns the number of items."""
+    purchase_prices = purchase_prices or {}
+    with open_report_writer(path) as writer:
+        writer.write_row(report_header())
+        for item, info in rows:
+            writer.write_row(report_row(item, info, purchase_prices.get(item.offer_id)))
+        return writer.rows_written - 1
+
+
+def export_store(
+    store: CatalogStore,
+    path: Path,
+    purchase_prices: Mapping[str, Decimal] | None = None,
+) -> int:
+    """Export the locally stored catalog, materializing one item at a time."""
+    return write_report(
+        path,
+        (
+            (store.materialize(row), store.product_info(row))
+            for row in range(len(store))
+        ),
+        purchase_prices,
+    )
+
+
+async def export_catalog(
+    path: Path,
+    *,
+    client: APIClient,
+    purchase_prices: Mapping[str, Decimal] | None = None,
+    store: CatalogStore | None = None,
+) -> int:
+    """Sync the catalog from the API and write report rows as pages arrive.
+
+    If ``store`` is given it is updated along the way as well.
+    """
+    purchase_prices = purchase_prices or {}
+    with open_report_writer(path) as writer:
+        writer.write_row(report_header())
+        async for page in iter_enriched_prices(client=client):
+            for item, info in page:
+                if store is not None:
+                    store.add(item, info)
+                writer.write_row(
+                    report_row(item, info, purchase_prices.get(item.offer_id))
+                )
+        return writer.rows_written - 1
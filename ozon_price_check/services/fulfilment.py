@@ -0,0 +1,220 @@
+"""FBS vs FBO comparison across the whole locally stored catalog.
+
+``Item.fbs_total_commission`` and ``Item.fbo_total_commission`` use the
+``*_max_amount`` logistics costs. Ozon also reports ``*_min_amount`` bounds,
+so every commission here is computed twice: with the minimum fixed costs
+(best case) and with the maximum ones (worst case, equal to the ``Item``
+values). Profit and margin get the same best/worst-case range. Gain is what
+switching from FBS to FBO saves per sale; it does not depend on the purchase
+price, so SKUs are ranked even when it is unknown.
+"""
+
+import math
+from array import array
+from collections.abc import Mapping
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Any
+
+from ..catalog import (
+    FIXED_SCALE,
+    CatalogStore,
+    from_fixed,
+    margin_hundredths,
+    to_fixed,
+)
+from ..i18n.ru_labels import ru_label
+
+# Fixed cost components with the lower logistics bounds.
+BEST_CASE_FIXED_FIELDS: dict[str, tuple[str, ...]] = {
+    "fbs": (
+        "acquiring",
+        "fbs_deliv_to_customer_amount",
+        "fbs_first_mile_min_amount",
+        "fbs_direct_flow_trans_min_amount",
+    ),
+    "fbo": (
+        "acquiring",
+        "fbo_deliv_to_customer_amount",
+        "fbo_direct_flow_trans_min_amount",
+    ),
+}
+
+FULFILMENT_FIELDS: tuple[str, ...] = (
+    "offer_id",
+    "marketing_seller_price",
+    "user_purchase_price",
+    "fbs_total_commission",
+    "fbs_commission_min",
+    "fbs_profit",
+    "fbs_profit_margin",
+    "fbs_profit_best",
+    "fbs_profit_margin_best",
+    "fbo_total_commission",
+    "fbo_commission_min",
+    "fbo_profit",
+    "fbo_profit_margin",
+    "fbo_profit_best",
+    "fbo_profit_margin_best",
+    "fbo_gain",
+    "fbo_gain_min",
+    "fbo_gain_max",
+    "recommended_scheme",
+)
+
+
+@dataclass
+class FulfilmentAnalysis:
+    """Per-row commissions, profit and switching gain for both schemes.
+
+    Commission and gain columns are fixed-point integers (see
+    ``catalog.to_fixed``); profit and margin are floats with NaN where the
+    purchase price is unknown. ``*_profit``/``*_margin`` are the worst case
+    (the ``Item`` commissions), ``*_best`` the best case.
+    """
+
+    store: CatalogStore
+    price: array
+    purchase: array
+    fbs_min: array
+    fbs_max: array
+    fbo_min: array
+    fbo_max: array
+    fbs_profit: array
+    fbs_margin: array
+    fbo_profit: array
+    fbo_margin: array
+    fbs_profit_best: array
+    fbs_margin_best: array
+    fbo_profit_best: array
+    fbo_margin_best: array
+
+    def __len__(self) -> int:
+        return len(self.store)
+
+    def gain(self, row: int) -> int:
+        """FBO saving over FBS per sale with the ``Item`` commissions."""
+        return self.fbs_max[row] - self.fbo_max[row]
+
+    def gain_range(self, row: int) -> tuple[int, int]:
+        """Lowest and highest possible gain given the logistics bounds."""
+        fbs = (self.fbs_min[row], self.fbs_max[row])
+        fbo = (self.fbo_min[row], self.fbo_max[row])
+        return min(fbs) - max(fbo), max(fbs) - min(fbo)
+
+    def recommended(self, row: int) -> str:
+        """Scheme that wins in every case, else the nominal winner with ``?``."""
+        low, high = self.gain_range(row)
+        if low > 0:
+            return "FBO"
+        if high < 0:
+            return "FBS"
+        return "FBO?" if self.gain(row) > 0 else "FBS?"
+
+    def ranking(self, limit: int | None = None) -> list[int]:
+        """Rows ordered by gain from switching, biggest saving first."""
+        rows = sorted(range(len(self)), key=self.gain, reverse=True)
+        return rows if limit is None else rows[:limit]
+
+    def profit_range(self, row: int, scheme: str) -> tuple[float, float]:
+        """Worst- and best-case profit for ``scheme`` (NaN without a purchase price)."""
+        if scheme == "fbs":
+            return self.fbs_profit[row], self.fbs_profit_best[row]
+        return self.fbo_profit[row], self.fbo_profit_best[row]
+
+    def margin_range(self, row: int, scheme: str) -> tuple[float, float]:
+        """Worst- and best-case margin, %, for ``scheme``."""
+        if scheme == "fbs":
+            return self.fbs_margin[row], self.fbs_margin_best[row]
+        return self.fbo_margin[row], self.fbo_margin_best[row]
+
+    def row_values(self, row: int) -> list[Any]:
+        """Report values for one row in ``FULFILMENT_FIELDS`` order."""
+        has_purchase = not math.isnan(self.fbs_profit[row])
+        low, high = self.gain_range(row)
+
+        def number(value: float) -> Decimal | None:
+            return None if math.isnan(value) else Decimal(f"{value:.2f}")
+
+        return [
+            self.store.offer_ids[row],
+            from_fixed(self.price[row]),
+            from_fixed(self.purchase[row]) if has_purchase else None,
+            from_fixed(self.fbs_max[row]),
+            from_fixed(self.fbs_min[row]),
+            number(self.fbs_profit[row]),
+            number(self.fbs_margin[row]),
+            number(self.fbs_profit_best[row]),
+            number(self.fbs_margin_best[row]),
+            from_fixed(self.fbo_max[row]),
+            from_fixed(self.fbo_min[row]),
+            number(self.fbo_profit[row]),
+            number(self.fbo_margin[row]),
+            number(self.fbo_profit_best[row]),
+            number(self.fbo_margin_best[row]),
+            from_fixed(self.gain(row)),
+            from_fixed(low),
+            from_fixed(high),
+            self.recommended(row),
+        ]
+
+
+def fulfilment_header() -> list[str]:
+    return [ru_label(name) for name in FULFILMENT_FIELDS]
+
+
+def _profit_columns(
+    price: array, commissions: array, purchase: array, known: bytearray
+) -> tuple[array, array]:
+    profit = array("d", bytes(8 * len(price)))
+    margin = array("d", bytes(8 * len(price)))
+    for row in range(len(price)):
+        if not known[row]:
+            profit[row] = margin[row] = math.nan
+            continue
+        profit_fixed = price[row] - commissions[row] - purchase[row]
+        profit[row] = profit_fixed / FIXED_SCALE
+        margin[row] = margin_hundredths(profit_fixed, purchase[row]) / 100
+    return profit, margin
+
+
+def analyze_fulfilment(
+    store: CatalogStore,
+    purchase_prices: Mapping[str, Decimal] | None = None,
+) -> FulfilmentAnalysis:
+    """Compare FBS and FBO for every row of ``store`` using integer columns."""
+    purchase_prices = purchase_prices or {}
+    price = store.decimals["marketing_seller_price"]
+    purchase = array("q", bytes(8 * len(store)))
+    known = bytearray(len(store))
+    for row, offer_id in enumerate(store.offer_ids):
+        value = purchase_prices.get(offer_id)
+        if value is not None:
+            purchase[row] = to_fixed(value)
+            known[row] = 1
+
+    fbs_max = store.total_commissions("fbs")
+    fbo_max = store.total_commissions("fbo")
+    fbs_min = store.total_commissions("fbs", fixed_fields=BEST_CASE_FIXED_FIELDS["fbs"])
+    fbo_min = store.total_commissions("fbo", fixed_fields=BEST_CASE_FIXED_FIELDS["fbo"])
+    fbs_profit, fbs_margin = _profit_columns(price, fbs_max, purchase, known)
+    fbo_profit, fbo_margin = _profit_columns(price, fbo_max, purchase, known)
+    fbs_profit_best, fbs_margin_best = _profit_columns(price, fbs_min, purchase, known)
+    fbo_profit_best, fbo_margin_best = _profit_columns(price, fbo_min, purchase, known)
+    return FulfilmentAnalysis(
+        store=store,
+        price=price,
+        purchase=purchase,
+        fbs_min=fbs_min,
+        fbs_max=fbs_max,
+        fbo_min=fbo_min,
+        fbo_max=fbo_max,
+        fbs_profit=fbs_profit,
+        fbs_margin=fbs_margin,
+        fbo_profit=fbo_profit,
+        fbo_margin=fbo_margin,
+        fbs_profit_best=fbs_profit_best,
+        fbs_margin_best=fbs_margin_best,
+        fbo_profit_best=fbo_profit_best,
+        fbo_margin_best=fbo_margin_best,
+    )
@@ -0,0 +1,97 @@
+"""Background re-polling of the displayed card and pinned SKUs.
+
+Live mode polls only ``/v5/product/info/prices``: one batched request for
+the displayed SKU and all pinned ones, at ``Priority.PREFETCH`` so it never
+delays a lookup. OZON has no conditional requests (ETag/If-None-Match), so
+"not modified" is decided on our side: each polled ``Item`` is compared with
+the previous one, and only changed SKUs are passed on to the UI, which then
+updates just the cells whose text differs.
+
+Product info (name, stocks) is not re-polled; the card keeps the info from
+the last F5.
+"""
+
+import os
+from collections.abc import Iterable
+from dataclasses import dataclass
+from decimal import Decimal
+
+from ..client import ProductsAPIClient
+from ..concurrency import Priority
+from ..core_client import APIClient
+from ..lookup_server import LookupClient
+from ..schemas import Item, ProductInfo
+
+LIVE_INTERVAL_ENV = "OZON_LIVE_INTERVAL"
+DEFAULT_LIVE_INTERVAL = 60.0
+MIN_LIVE_INTERVAL = 5.0
+
+
+def live_interval(value: float | None = None) -> float:
+    """Polling interval: ``value``, else ``OZON_LIVE_INTERVAL``, else the default."""
+    if value is None:
+        try:
+            value = float(os.environ.get(LIVE_INTERVAL_ENV) or DEFAULT_LIVE_INTERVAL)
+        except ValueError:
+            value = DEFAULT_LIVE_INTERVAL
+    return max(value, MIN_LIVE_INTERVAL)
+
+
+@dataclass
+class LiveCard:
+    """What the card was built from, so it can be rebuilt with fresh prices."""
+
+    item: Item
+    info: ProductInfo | None
+    purchase_price: Decimal | None
+
+    @property
+    def offer_id(self) -> str:
+        return self.item.offer_id
+
+
+async def poll_prices(
+    offer_ids: Iterable[str], *, client: APIClient | LookupClient
+) -> dict[str, Item]:
+    """Current price items by offer_id; unknown SKUs are left out.
+
+    Through the shared lookup server the poll is batched there as well and
+    goes via its short-lived prices cache, so several TUIs watching the same
+    SKU cost one API call.
+    """
+    skus = sorted(set(offer_ids))
+    if not skus:
+        return {}
+    if isinstance(client, LookupClient):
+        items = await client.fetch_prices(skus)
+    else:
+        items = await ProductsAPIClient(client).get_product_prices(
+            skus, priority=Priority.PREFETCH
+        )
+    return {item.offer_id: item for item in items}
+
+
+class LiveWatch:
+    """Remembers the last seen state of each SKU and reports changes."""
+
+    def __init__(self) -> None:
+        self._seen: dict[str, Item] = {}
+
+    def seed(self, item: Item) -> None:
+        self._seen[item.offer_id] = item
+
+    def forget(self, offer_id: str) -> None:
+        self._seen.pop(offer_id, None)
+
+    def changed(self, items: dict[str, Item]) -> dict[str, Item]:
+        """Items that differ from their previous state.
+
+        SKUs seen for the first time only set the baseline.
+        """
+        changed = {
+            offer_id: item
+            for offer_id, item in items.items()
+            if offer_id in self._seen and self._seen[offer_id] != item
+        }
+        self._seen.update(items)
+        return changed
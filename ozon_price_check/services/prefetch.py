@@ -0,0 +1,134 @@
+"""Speculative prefetch of product cards while the SKU is being typed.
+
+The TUI starts a prefetch once the SKU input has held a plausible offer_id
+for ``PREFETCH_DEBOUNCE`` seconds. Requests run at ``Priority.PREFETCH``:
+below interactive lookups, ahead of bulk traffic such as a catalog sync.
+The item and all price-independent sections are kept for ``PREFETCH_TTL``
+seconds, so F5 only adds the profit sections for the entered purchase price.
+F5 uses a prefetch only once it has finished; one still in flight is
+cancelled and F5 runs its own hedged, interactive-priority lookup.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Coroutine
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from ..concurrency import Priority
+from ..core_client import APIClient
+from ..lookup_server import LookupClient
+from ..schemas import Item, ProductInfo
+from ..search_index import SkuSearchIndex
+from .enrichment import fetch_enriched_item
+from .products import Section, card_sections
+
+PREFETCH_DEBOUNCE = 0.35
+PREFETCH_TTL = 60.0
+MAX_PREFETCHED = 32
+MIN_OFFER_ID_LENGTH = 3
+
+
+@dataclass(frozen=True)
+class PrefetchedCard:
+    item: Item
+    info: ProductInfo | None
+    sections: list[Section]
+
+
+def looks_like_offer_id(text: str, known: SkuSearchIndex | None = None) -> bool:
+    """Whether ``text`` is worth prefetching.
+
+    With a non-empty ``known`` index (the local catalog) only known offer_ids
+    qualify; without one, any single token of ``MIN_OFFER_ID_LENGTH`` or more
+    characters does.
+    """
+    sku = text.strip()
+    if known:
+        return sku in known
+    return len(sku) >= MIN_OFFER_ID_LENGTH and not any(c.isspace() for c in sku)
+
+
+async def prefetch_card(
+    sku: str, *, client: APIClient | LookupClient
+) -> PrefetchedCard:
+    """Fetch one card at prefetch priority, without hedging."""
+    if isinstance(client, LookupClient):
+        item, info = await client.fetch_enriched_item(sku, prefetch=True)
+    else:
+        item, info = await fetch_enriched_item(
+            sku, client=client, interactive=False, priority=Priority.PREFETCH
+        )
+    return PrefetchedCard(item, info, card_sections(item, info))
+
+
+def _retrieve_exception(task: "asyncio.Task[PrefetchedCard]") -> None:
+    # Failed prefetches are expected (typos, unknown SKUs) and never awaited.
+    if not task.cancelled():
+        task.exception()
+
+
+class PrefetchCache:
+    """Recent prefetch tasks by SKU; expired, failed and evicted ones are dropped."""
+
+    def __init__(
+        self, ttl: float = PREFETCH_TTL, max_entries: int = MAX_PREFETCHED
+    ) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._tasks: OrderedDict[str, tuple[float, asyncio.Task[PrefetchedCard]]] = (
+            OrderedDict()
+        )
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    def get(self, sku: str) -> Optional["asyncio.Task[PrefetchedCard]"]:
+        """The pending or finished task for ``sku`` if it is still usable."""
+        entry = self._tasks.get(sku)
+        if entry is None:
+            return None
+        started, task = entry
+        failed = task.done() and (task.cancelled() or task.exception() is not None)
+        if failed or time.monotonic() - started > self.ttl:
+            self.discard(sku)
+            return None
+        return task
+
+    def take(self, sku: str) -> PrefetchedCard | None:
+        """The finished card for ``sku``; the entry is removed either way.
+
+        A prefetch still in flight is cancelled and None returned, so the
+        caller does its own lookup instead of waiting at prefetch priority.
+        """
+        task = self.get(sku)
+        if task is None:
+            return None
+        self.discard(sku)
+        return task.result() if task.done() else None
+
+    def start(
+        self, sku: str, fetch: Callable[[str], Coroutine[Any, Any, PrefetchedCard]]
+    ) -> "asyncio.Task[PrefetchedCard]":
+        """Start prefetching ``sku`` unless a usable entry already exists."""
+        task = self.get(sku)
+        if task is not None:
+            return task
+        task = asyncio.create_task(fetch(sku))
+        task.add_done_callback(_retrieve_exception)
+        self._tasks[sku] = (time.monotonic(), task)
+        while len(self._tasks) > self.max_entries:
+            _, (_, evicted) = self._tasks.popitem(last=False)
+            evicted.cancel()
+        return task
+
+    def discard(self, sku: str) -> None:
+        entry = self._tasks.pop(sku, None)
+        if entry is not None:
+            entry[1].cancel()
+
+    def clear(self) -> None:
+        for _, task in self._tasks.values():
+            task.cancel()
+        self._tasks.clear()
@@ -1,26 +1,30 @@
 """Product data fetching and formatting services."""
 
-from decimal import Decimal, ROUND_HALF_UP
-from typing import TypedDict, List, Tuple, Dict, Any, Optional
+from collections.abc import Mapping
 from datetime import datetime
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Any, TypedDict
 
 from pydantic import BaseModel
 
 from ..core_client import APIClient
-from ..client import ProductsAPIClient
+from ..i18n.ru_labels import ru_label
+from ..lookup_server import LookupClient
+from ..profiling import stage
 from ..schemas import (
-    Item,
     Commissions,
+    Item,
+    MarketingActions,
     Price,
     PriceIndexes,
-    MarketingActions,
+    ProductInfo,
 )
-from ..i18n.ru_labels import ru_label
+from .enrichment import fetch_enriched_item
 
 
 class Section(TypedDict):
     title: str
-    rows: List[Tuple[str, str]]
+    rows: list[tuple[str, str]]
 
 
 def format_value(value: Any) -> str:
@@ -40,7 +44,7 @@ def format_value(value: Any) -> str:
 
 
 def create_section_from_model(
-    model: BaseModel, title: str, exclude_fields: Optional[set] = None
+    model: BaseModel, title: str, exclude_fields: set | None = None
 ) -> Section:
     """Create a section from a Pydantic model."""
     exclude_fields = exclude_fields or set()
@@ -111,7 +115,7 @@ def create_marketing_actions_section(marketing_actions: MarketingActions) -> Sec
     return Section(title="Маркетинговые акции", rows=rows)
 
 
-def create_price_indexes_section(price_indexes: PriceIndexes) -> List[Section]:
+def create_price_indexes_section(price_indexes: PriceIndexes) -> list[Section]:
     """Create price indexes sections."""
     sections = []
 
@@ -142,39 +146,110 @@ def create_price_indexes_section(price_indexes: PriceIndexes) -> List[Section]:
     return sections
 
 
+def create_product_info_section(info: ProductInfo) -> Section:
+    """Create product description section (name, barcodes, stocks)."""
+    rows = [
+        (ru_label("name"), format_value(info.name or None)),
+        (ru_label("barcodes"), ", ".join(info.barcodes) or "—"),
+        (ru_label("stock_present"), format_value(info.stock_present)),
+        (ru_label("stock_reserved"), format_value(info.stock_reserved)),
+    ]
+    for stock in info.stocks.stocks:
+        rows.append(
+            (
+                f"{ru_label('stock_present')} {stock.source.upper()}",
+                f"{stock.present} ({ru_label('stock_reserved').lower()}: {stock.reserved})",
+            )
+        )
+    return Section(title="Товар", rows=rows)
+
+
 async def fetch_product_data(
     sku: str,
     *,
-    client: APIClient,
-    user_purchase_price: Optional[Decimal] = None,
-) -> Dict[str, Any]:
+    client: APIClient | LookupClient,
+    user_purchase_price: Decimal | None = None,
+    purchase_prices: Mapping[str, Decimal] | None = None,
+) -> dict[str, Any]:
     """
     Fetch and format product data for UI display.
 
+    ``client`` is either an ``APIClient`` or a ``LookupClient`` connected to
+    the shared lookup server. If ``user_purchase_price`` is not given, it is
+    looked up by offer_id in ``purchase_prices`` (e.g. the purchase price
+    registry).
+
     Returns:
-        Dict with 'sections' (list[Section]) and 'raw' (original data)
+        Dict with 'sections' (list[Section]), 'raw' (original data), 'info'
+        (ProductInfo or None) and 'purchase_price' (the price used, or None).
         Or 'error' field if something fails.
     """
     try:
-        product_client = ProductsAPIClient(client)
-        ozon_item: Item = await product_client.get_product_info(sku)
-        sections = sections_from_item(ozon_item, user_purchase_price)
-        return {"sections": sections, "raw": ozon_item}
+        if isinstance(client, LookupClient):
+            ozon_item, info = await client.fetch_enriched_item(sku)
+        else:
+            ozon_item, info = await fetch_enriched_item(sku, client=client)
+        return product_data(
+            ozon_item,
+            info,
+            user_purchase_price=user_purchase_price,
+            purchase_prices=purchase_prices,
+        )
 
     except Exception as e:
         return {"error": f"Ошибка получения данных: {type(e).__name__}: {str(e)}"}
 
 
-def create_profit_section(item: Item, user_purchase_price: Decimal) -> Section:
-    """Create profit calculation section."""
-    marketing_seller_price = item.price.marketing_seller_price
-    total_commission = item.fbs_total_commission
-    profit = marketing_seller_price - total_commission - user_purchase_price
+def product_data(
+    item: Item,
+    info: ProductInfo | None = None,
+    *,
+    user_purchase_price: Decimal | None = None,
+    purchase_prices: Mapping[str, Decimal] | None = None,
+    base_sections: list[Section] | None = None,
+) -> dict[str, Any]:
+    """Build the ``fetch_product_data`` result for an already fetched item.
+
+    ``base_sections`` are precomputed ``card_sections`` (e.g. from a
+    prefetch); then only the profit sections are computed here.
+    """
+    if user_purchase_price is None and purchase_prices is not None:
+        user_purchase_price = purchase_prices.get(item.offer_id)
+    with stage("sections"):
+        if base_sections is None:
+            sections = sections_from_item(item, user_purchase_price, info)
+        elif user_purchase_price is None:
+            sections = list(base_sections)
+        else:
+            sections = profit_sections(item, user_purchase_price) + base_sections
+    return {
+        "sections": sections,
+        "raw": item,
+        "info": info,
+        "purchase_price": user_purchase_price,
+    }
+
+
+def calculate_profit(
+    sale_price: Decimal, total_commission: Decimal, user_purchase_price: Decimal
+) -> tuple[Decimal, Decimal]:
+    """Return profit and profit margin (% of purchase price) for a sale."""
+    profit = sale_price - total_commission - user_purchase_price
 
     # Calculate profit margin as percentage
     profit_margin = Decimal(0)
     if user_purchase_price > 0:
         profit_margin = (profit / user_purchase_price * 100).quantize(Decimal("0.01"))
+    return profit, profit_margin
+
+
+def create_profit_section(item: Item, user_purchase_price: Decimal) -> Section:
+    """Create profit calculation section."""
+    marketing_seller_price = item.price.marketing_seller_price
+    total_commission = item.fbs_total_commission
+    profit, profit_margin = calculate_profit(
+        marketing_seller_price, total_commission, user_purchase_price
+    )
 
     rows = [
         (ru_label("user_purchase_price"), format_value(user_purchase_price)),
@@ -196,11 +271,9 @@ def create_profit_for_min_section(item: Item, user_purchase_price: Decimal) -> S
     ).to_integral_value(ROUND_HALF_UP)
 
     total_commission = commission + ozon_percent_value
-    profit = minimal_price - total_commission - user_purchase_price
-
-    profit_margin = Decimal(0)
-    if user_purchase_price > 0:
-        profit_margin = (profit / user_purchase_price * 100).quantize(Decimal("0.01"))
+    profit, profit_margin = calculate_profit(
+        minimal_price, total_commission, user_purchase_price
+    )
 
     rows = [
         (ru_label("user_purchase_price"), format_value(user_purchase_price)),
@@ -213,20 +286,21 @@ def create_profit_for_min_section(item: Item, user_purchase_price: Decimal) -> S
     return Section(title="Расчёт прибыли от минимальной цены", rows=rows)
 
 
-def sections_from_item(
-    item: Item, user_purchase_price: Optional[Decimal] = None
-) -> List[Section]:
-    """Create sections from full Item model."""
+def profit_sections(item: Item, user_purchase_price: Decimal) -> list[Section]:
+    """Both profit sections; the only part of a card that depends on the price."""
+    return [
+        create_profit_section(item, user_purchase_price),
+        create_profit_for_min_section(item, user_purchase_price),
+    ]
+
+
+def card_sections(item: Item, info: ProductInfo | None = None) -> list[Section]:
+    """All card sections that do not depend on the purchase price."""
     sections = []
 
-    # Add profit section first if user provided purchase price
-    if user_purchase_price is not None:
-        profit_section = create_profit_section(item, user_purchase_price)
-        profit_section_for_min_price = create_profit_for_min_section(
-            item, user_purchase_price
-        )
-        sections.append(profit_section)
-        sections.append(profit_section_for_min_price)
+    # Product description, when /v3/product/info/list data is available
+    if info is not None:
+        sections.append(create_product_info_section(info))
 
     # Main item section (exclude nested objects)
     main_section = create_section_from_model(
@@ -253,3 +327,19 @@ def sections_from_item(
     sections.append(marketing_section)
 
     return sections
+
+
+def sections_from_item(
+    item: Item,
+    user_purchase_price: Decimal | None = None,
+    info: ProductInfo | None = None,
+) -> list[Section]:
+    """Create sections from full Item model."""
+    sections = []
+
+    # Add profit section first if user provided purchase price
+    if user_purchase_price is not None:
+        sections.extend(profit_sections(item, user_purchase_price))
+
+    sections.extend(card_sections(item, info))
+    return sections
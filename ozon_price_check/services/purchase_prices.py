@@ -0,0 +1,220 @@
+"""Persistent SKU → purchase price registry.
+
+Prices are stored in SQLite in the user data directory: ``purchase_prices`` holds
+the current value per ``offer_id`` and ``purchase_price_history`` every
+version ever written. The current prices are also kept in a dict, so the
+registry works as a ``Mapping[str, Decimal]`` with O(1) lookups and can be
+passed anywhere a ``purchase_prices`` mapping is expected.
+
+Several registries may share the file (two TUIs, or ``import-prices`` while
+the TUI is open): writes compare against and number versions from the
+database, not the dict, and ``refresh`` picks up changes made elsewhere.
+"""
+
+import csv
+import sqlite3
+from collections.abc import Iterable, Iterator, Mapping
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from decimal import Decimal, InvalidOperation
+from pathlib import Path
+from types import TracebackType
+from typing import Self
+
+from platformdirs import user_data_dir
+
+from ..utils import parse_price
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS purchase_prices (
+    offer_id TEXT PRIMARY KEY,
+    price TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS purchase_price_history (
+    offer_id TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    price TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    source TEXT NOT NULL,
+    PRIMARY KEY (offer_id, version)
+);
+"""
+
+
+def _registry_path() -> Path:
+    data_dir = Path(user_data_dir("price-check", "kashikuroni"))
+    data_dir.mkdir(parents=True, exist_ok=True)
+    return data_dir / "purchase_prices.sqlite3"
+
+
+@dataclass(frozen=True)
+class PriceVersion:
+    version: int
+    price: Decimal
+    updated_at: datetime
+    source: str
+
+
+@dataclass
+class ImportResult:
+    """Outcome of a bulk import; ``errors`` holds (line number, message)."""
+
+    updated: int = 0
+    unchanged: int = 0
+    errors: list[tuple[int, str]] = field(default_factory=list)
+
+
+class PurchasePriceRegistry(Mapping[str, Decimal]):
+    """SQLite-backed purchase prices with an in-memory index of current values."""
+
+    def __init__(self, path: Path | None = None) -> None:
+        self.path = Path(path) if path is not None else _registry_path()
+        self._conn = sqlite3.connect(self.path)
+        self._conn.executescript(_SCHEMA)
+        self._prices: dict[str, Decimal] = {}
+        self._data_version = -1
+        self.refresh()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def __getitem__(self, offer_id: str) -> Decimal:
+        return self._prices[offer_id]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._prices)
+
+    def __len__(self) -> int:
+        return len(self._prices)
+
+    def refresh(self) -> None:
+        """Reload the current prices if another connection changed them."""
+        (data_version,) = self._conn.execute("PRAGMA data_version").fetchone()
+        if data_version != self._data_version:
+            self._load()
+            self._data_version = data_version
+
+    def _load(self) -> None:
+        self._prices = {
+            offer_id: Decimal(price)
+            for offer_id, price in self._conn.execute(
+                "SELECT offer_id, price FROM purchase_prices"
+            )
+        }
+
+    def set(self, offer_id: str, price: Decimal, source: str = "manual") -> bool:
+        """Store a price for one SKU; returns False if it did not change."""
+        return self.update([(offer_id, price)], source) == 1
+
+    def update(
+        self, prices: Iterable[tuple[str, Decimal]], source: str = "manual"
+    ) -> int:
+        """Store many prices in one transaction; returns how many changed.
+
+        Unchanged prices do not create a new version. The comparison and the
+        next version number come from the database inside a write
+        transaction, so a concurrent writer cannot reuse a version.
+        """
+        pending = dict(prices)
+        if not pending:
+            return 0
+        now = datetime.now(UTC).isoformat()
+        changed = 0
+        with self._conn:
+            # Take the write lock before reading, not at the first write.
+            self._conn.execute("BEGIN IMMEDIATE")
+            for offer_id, price in pending.items():
+                stored = self._conn.execute(
+                    "SELECT price FROM purchase_prices WHERE offer_id = ?",
+                    (offer_id,),
+                ).fetchone()
+                if stored is not None and Decimal(stored[0]) == price:
+                    continue
+                (version,) = self._conn.execute(
+                    "SELECT COALESCE(MAX(version), 0) + 1 "
+                    "FROM purchase_price_history WHERE offer_id = ?",
+                    (offer_id,),
+                ).fetchone()
+                row = (offer_id, str(price), version, now)
+                self._conn.execute(
+                    "INSERT INTO purchase_price_history "
+                    "(offer_id, price, version, updated_at, source) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    row + (source,),
+                )
+                self._conn.execute(
+                    "INSERT INTO purchase_prices (offer_id, price, version, updated_at) "
+                    "VALUES (?, ?, ?, ?) ON CONFLICT(offer_id) DO UPDATE SET "
+                    "price = excluded.price, version = excluded.version, "
+                    "updated_at = excluded.updated_at",
+                    row,
+                )
+                changed += 1
+        # Also picks up what other registries on the same file have written.
+        self._load()
+        return changed
+
+    def history(self, offer_id: str) -> list[PriceVersion]:
+        """All stored versions for ``offer_id``, oldest first."""
+        return [
+            PriceVersion(version, Decimal(price), datetime.fromisoformat(at), source)
+            for version, price, at, source in self._conn.execute(
+                "SELECT version, price, updated_at, source "
+                "FROM purchase_price_history WHERE offer_id = ? ORDER BY version",
+                (offer_id,),
+            )
+        ]
+
+    def import_csv(self, path: Path, source: str | None = None) -> ImportResult:
+        """Import ``offer_id;price`` rows, parsing prices like the price input.
+
+        The delimiter (``;``, ``,`` or tab) is detected from the file, a header
+        row is skipped, and invalid rows are reported instead of aborting.
+        With ``,`` as the delimiter, prices with a decimal comma must be quoted.
+        """
+        path = Path(path)
+        result = ImportResult()
+        parsed: dict[str, Decimal] = {}
+        with path.open(encoding="utf-8-sig", newline="") as fh:
+            sample = fh.read(64 * 1024)
+            fh.seek(0)
+            try:
+                dialect: type[csv.Dialect] | csv.Dialect = csv.Sniffer().sniff(
+                    sample, delimiters=";,\t"
+                )
+            except csv.Error:
+                dialect = csv.excel
+            for line_no, row in enumerate(csv.reader(fh, dialect), 1):
+                if not row or not "".join(row).strip():
+                    continue
+                if len(row) < 2:
+                    result.errors.append((line_no, "ожидается артикул и цена"))
+                    continue
+                offer_id = row[0].strip()
+                try:
+                    price = parse_price(row[1])
+                except InvalidOperation:
+                    if line_no > 1:
+                        result.errors.append((line_no, f"неверная цена: {row[1]!r}"))
+                    continue
+                if not offer_id or not price.is_finite() or price < 0:
+                    result.errors.append((line_no, f"неверная строка: {row!r}"))
+                    continue
+                parsed[offer_id] = price
+
+        result.updated = self.update(parsed.items(), source or f"csv:{path.name}")
+        result.unchanged = len(parsed) - result.updated
+        return result
+
+    def close(self) -> None:
+        self._conn.close()
@@ -0,0 +1,265 @@
+"""Profit and margin over a grid of candidate sale and purchase prices.
+
+For every SKU the grid spans ``price_steps`` sale prices and
+``purchase_steps`` purchase prices within ±``span`` of the current ones.
+The whole grid is computed in one pass of fixed-point integer arithmetic over
+flat ``array`` columns (see ``catalog``):
+
+* the commission is computed once per candidate price with the same
+  ``ROUND_HALF_UP`` steps as ``Item.fbs_total_commission``;
+* profit and margin per cell match ``products.calculate_profit`` exactly,
+  including the margin quantized to 0.01 with ``ROUND_HALF_EVEN`` (the
+  ``Decimal`` context default).
+
+Cells are grouped into margin bands for heatmap colouring in the TUI and in
+XLSX exports.
+"""
+
+from array import array
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass
+from decimal import Decimal
+from pathlib import Path
+from typing import Any
+
+from ..catalog import (
+    COMMISSION_WITHOUT_PERCENT_FIELDS,
+    FIXED_SCALE,
+    SALES_PERCENT_FIELDS,
+    CatalogStore,
+    from_fixed,
+    margin_hundredths,
+    round_half_up_div,
+    to_fixed,
+)
+from ..i18n.ru_labels import ru_label
+from ..schemas import Item
+from .export import open_report_writer
+
+DEFAULT_SPAN = Decimal("0.2")
+# Margin band lower bounds in percent; below the first one is a loss.
+MARGIN_BANDS: tuple[int, ...] = (0, 10, 20, 40)
+# Heatmap colour per band, from loss to the highest margins.
+BAND_COLORS: tuple[str, ...] = ("red", "orange", "yellow", "lightgreen", "green")
+
+_BASIS_POINTS = 10_000
+_KOPECK = FIXED_SCALE // 100
+# Margins are stored in hundredths of a percent.
+_MARGIN_SCALE = 100
+_BAND_BOUNDS = tuple(bound * _MARGIN_SCALE for bound in MARGIN_BANDS)
+
+
+@dataclass(frozen=True)
+class GridSpec:
+    price_steps: int = 10
+    purchase_steps: int = 10
+    span: Decimal = DEFAULT_SPAN
+
+    def factors(self, steps: int) -> list[int]:
+        """Evenly spaced multipliers in basis points, from 1 − span to 1 + span."""
+        if steps == 1:
+            return [_BASIS_POINTS]
+        span = int(self.span * _BASIS_POINTS)
+        return [
+            _BASIS_POINTS - span + round_half_up_div(2 * span * i, steps - 1)
+            for i in range(steps)
+        ]
+
+
+def _scale_to_kopecks(value: int, factor: int) -> int:
+    return round_half_up_div(value * factor, _BASIS_POINTS * _KOPECK) * _KOPECK
+
+
+@dataclass
+class SensitivityGrid:
+    """Grid values for many SKUs in flat arrays.
+
+    ``prices`` and ``commissions`` hold ``price_steps`` values per SKU,
+    ``purchases`` ``purchase_steps`` values; ``profit`` and ``margin`` hold
+    ``price_steps × purchase_steps`` cells per SKU, row-major by price.
+    Money is fixed-point (``catalog.to_fixed``), margins are hundredths of a
+    percent.
+    """
+
+    offer_ids: list[str]
+    spec: GridSpec
+    prices: array
+    commissions: array
+    purchases: array
+    profit: array
+    margin: array
+
+    def __len__(self) -> int:
+        return len(self.offer_ids)
+
+    def _cell(self, sku: int, i: int, j: int) -> int:
+        spec = self.spec
+        return (sku * spec.price_steps + i) * spec.purchase_steps + j
+
+    def price(self, sku: int, i: int) -> Decimal:
+        return from_fixed(self.prices[sku * self.spec.price_steps + i])
+
+    def commission(self, sku: int, i: int) -> Decimal:
+        return from_fixed(self.commissions[sku * self.spec.price_steps + i])
+
+    def purchase(self, sku: int, j: int) -> Decimal:
+        return from_fixed(self.purchases[sku * self.spec.purchase_steps + j])
+
+    def cell(self, sku: int, i: int, j: int) -> tuple[Decimal, Decimal]:
+        """Profit and margin (%) like ``calculate_profit`` for one grid cell."""
+        cell = self._cell(sku, i, j)
+        return (
+            from_fixed(self.profit[cell]),
+            Decimal(self.margin[cell]).scaleb(-2),
+        )
+
+    def band(self, sku: int, i: int, j: int) -> int:
+        """Index into ``BAND_COLORS`` for one cell."""
+        margin = self.margin[self._cell(sku, i, j)]
+        return sum(1 for bound in _BAND_BOUNDS if margin >= bound)
+
+
+def compute_grid(
+    offer_ids: Sequence[str],
+    prices: Sequence[int],
+    fixed_costs: Sequence[int],
+    percents: Sequence[int],
+    purchases: Sequence[int],
+    spec: GridSpec | None = None,
+) -> SensitivityGrid:
+    """Compute the grid from fixed-point columns with one value per SKU.
+
+    ``fixed_costs`` is the commission without the sales percent and
+    ``percents`` the sales percent itself.
+    """
+    spec = spec or GridSpec()
+    price_factors = spec.factors(spec.price_steps)
+    purchase_factors = spec.factors(spec.purchase_steps)
+    cells = spec.price_steps * spec.purchase_steps
+    count = len(offer_ids)
+    grid_prices = array("q", bytes(8 * count * spec.price_steps))
+    commissions = array("q", bytes(8 * count * spec.price_steps))
+    grid_purchases = array("q", bytes(8 * count * spec.purchase_steps))
+    profit = array("q", bytes(8 * count * cells))
+    margin = array("q", bytes(8 * count * cells))
+    percent_scale = 100 * FIXED_SCALE * FIXED_SCALE
+
+    cell = 0
+    for sku in range(count):
+        costs = [_scale_to_kopecks(purchases[sku], f) for f in purchase_factors]
+        grid_purchases[sku * spec.purchase_steps : (sku + 1) * spec.purchase_steps] = (
+            array("q", costs)
+        )
+        percent, fixed = percents[sku], fixed_costs[sku]
+        for i, factor in enumerate(price_factors):
+            price = _scale_to_kopecks(prices[sku], factor)
+            # Item.fbs_ozon_percent and fbs_total_commission, in integers.
+            ozon_percent = round_half_up_div(price * percent, percent_scale)
+            commission = (
+                round_half_up_div(ozon_percent * FIXED_SCALE + fixed, FIXED_SCALE)
+                * FIXED_SCALE
+            )
+            grid_prices[sku * spec.price_steps + i] = price
+            commissions[sku * spec.price_steps + i] = commission
+            net = price - commission
+            for cost in costs:
+                value = net - cost
+                profit[cell] = value
+                margin[cell] = margin_hundredths(value, cost)
+                cell += 1
+
+    return SensitivityGrid(
+        offer_ids=list(offer_ids),
+        spec=spec,
+        prices=grid_prices,
+        commissions=commissions,
+        purchases=grid_purchases,
+        profit=profit,
+        margin=margin,
+    )
+
+
+def grid_for_item(
+    item: Item,
+    purchase_price: Decimal,
+    spec: GridSpec | None = None,
+    scheme: str = "fbs",
+) -> SensitivityGrid:
+    """Grid around the item's marketing price and the given purchase price."""
+    fixed = getattr(item, f"{scheme}_commission_without_percent")
+    percent = getattr(item.commissions, SALES_PERCENT_FIELDS[scheme])
+    return compute_grid(
+        [item.offer_id],
+        [to_fixed(item.price.marketing_seller_price)],
+        [to_fixed(fixed)],
+        [to_fixed(percent)],
+        [to_fixed(purchase_price)],
+        spec,
+    )
+
+
+def grid_from_store(
+    store: CatalogStore,
+    purchase_prices: Mapping[str, Decimal],
+    spec: GridSpec | None = None,
+    scheme: str = "fbs",
+) -> SensitivityGrid:
+    """Grid for every stored SKU with a known purchase price."""
+    rows = [
+        row
+        for row, offer_id in enumerate(store.offer_ids)
+        if purchase_prices.get(offer_id) is not None
+    ]
+    fixed_columns = [
+        store.decimals[name] for name in COMMISSION_WITHOUT_PERCENT_FIELDS[scheme]
+    ]
+    prices = store.decimals["marketing_seller_price"]
+    percents = store.decimals[SALES_PERCENT_FIELDS[scheme]]
+    return compute_grid(
+        [store.offer_ids[row] for row in rows],
+        [prices[row] for row in rows],
+        [sum(column[row] for column in fixed_columns) for row in rows],
+        [percents[row] for row in rows],
+        [to_fixed(purchase_prices[store.offer_ids[row]]) for row in rows],
+        spec,
+    )
+
+
+def write_sensitivity(grid: SensitivityGrid, path: Path) -> int:
+    """Write one heatmap block per SKU to CSV or XLSX; returns the SKU count.
+
+    Each block has the sale prices (with their commission) as rows and the
+    purchase prices as columns, first for profit, then for margin. In XLSX
+    the cells are filled with the margin band colour.
+    """
+    spec = grid.spec
+    blank: list[Any] = [None]
+    with open_report_writer(path) as writer:
+        for sku, offer_id in enumerate(grid.offer_ids):
+            purchases = [grid.purchase(sku, j) for j in range(spec.purchase_steps)]
+            writer.write_row(
+                [offer_id, f"{ru_label('user_purchase_price')} →", ru_label("profit")]
+                + blank * spec.purchase_steps
+                + [f"{ru_label('profit_margin')}, %"]
+            )
+            writer.write_row(
+                [ru_label("marketing_price"), ru_label("total_commission")]
+                + purchases
+                + blank
+                + purchases
+            )
+            for i in range(spec.price_steps):
+                cells = [grid.cell(sku, i, j) for j in range(spec.purchase_steps)]
+                fills = [
+                    BAND_COLORS[grid.band(sku, i, j)]
+                    for j in range(spec.purchase_steps)
+                ]
+                writer.write_row(
+                    [grid.price(sku, i), grid.commission(sku, i)]
+                    + [profit for profit, _ in cells]
+                    + blank
+                    + [margin for _, margin in cells],
+                    fills=[None, None] + fills + [None] + fills,
+                )
+            writer.write_row([])
+    return len(grid)
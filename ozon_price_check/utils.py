@@ -1,4 +1,5 @@
 from datetime import datetime
+from decimal import Decimal, InvalidOperation
 
 
 def to_camel(s: str) -> str:
@@ -21,3 +22,14 @@ def get_current_date() -> str:
     current_date = datetime.now()
     formatted_date = current_date.strftime("%d.%m.%Y")
     return formatted_date
+
+
+def parse_price(user_input: str) -> Decimal:
+    """Parse price input accepting both comma and dot as decimal separator."""
+    s = (user_input or "").strip()
+    if not s:
+        raise InvalidOperation("empty")
+    if "," in s and "." in s:
+        raise InvalidOperation("both separators")
+    s = s.replace(",", ".")
+    return Decimal(s)